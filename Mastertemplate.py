@@ -1,216 +1,177 @@
 import os
-import zipfile
-import csv
+import io
 import collections
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-
-def extract_zip(zip_path, extract_to):
-    """Extract ZIP file to a directory."""
-    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-        zip_ref.extractall(extract_to)
-
-def clean_text(text):
-    """Remove unwanted characters and normalize text."""
-    return text.replace('"', '').replace("'", "").strip()
-
-def parse_csv(file_path):
-    """Parse CSV files while handling multi-line sections, parameters, and values correctly."""
-    sections = collections.defaultdict(lambda: {"parameters": set(), "values": []})
-    current_section = None
-    param_buffer = []
-    value_buffer = []
-    parameter_mode = False
-
-    with open(file_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-
-    merged_lines = []
+from typing import Dict, List
+from normalize import NORMALIZE_VERSION, clean_text, intern_name, intern_names
+from value_profile import ColumnarValues
+from template_model import OperatorTemplate
+from template_pipeline import TemplatePipeline, iter_zip_csvs, open_text, section_parameters
+from large_csv import parse_large_csv
+
+# Names this script's results in a shared --cache database; bump the version when parse output changes
+PARSE_CACHE_KEY = f"Mastertemplate/1/normalize-{NORMALIZE_VERSION}"
+
+def iter_merged_lines(f):
+    """Yield logical lines from an open CSV, merging broken multi-line parameters/values."""
     temp_line = ""
 
-    # Merge broken lines intelligently
-    for line in lines:
+    for line in f:
         stripped = line.strip()
         if stripped.startswith("@") and temp_line:
-            merged_lines.append(temp_line)
+            yield temp_line
             temp_line = stripped  # Start a new section
         elif stripped.endswith(",") or ("," in stripped and "\n" in line):
             temp_line += " " + stripped  # Merge multi-line parameters/values
         else:
             if temp_line:
-                merged_lines.append(temp_line)
+                yield temp_line
             temp_line = stripped
 
     if temp_line:
-        merged_lines.append(temp_line)
-
-    for line in merged_lines:
-        line = clean_text(line)
-        row = [clean_text(cell) for cell in line.split(",") if cell.strip()]
-
-        if not row:
-            continue  # Skip empty lines
-
-        if row[0].startswith("@"):  # Section name
-            if current_section and param_buffer:
-                sections[current_section]["parameters"].update(param_buffer)
-                param_buffer = []
-
-            if current_section and value_buffer:
-                sections[current_section]["values"].append(value_buffer)
-                value_buffer = []
-
-            current_section = row[0].replace("\n", "").strip()
-            parameter_mode = True  # Expect parameters next
-
-        elif parameter_mode:  # Parameter Line
-            param_buffer.extend(row)
-            if not line.endswith(","):  # End of parameter block
-                sections[current_section]["parameters"].update(param_buffer)
-                param_buffer = []
-                parameter_mode = False  # Switch to value mode
+        yield temp_line
+
+def _first_cell(line):
+    """Return the first cleaned, non-blank cell of a raw line without splitting all of it."""
+    start = 0
+    while True:
+        end = line.find(",", start)
+        cell = clean_text(line[start:] if end == -1 else line[start:end])
+        if cell:
+            return cell
+        if end == -1:
+            return None
+        start = end + 1
+
+def _ends_with_comma(line):
+    """Equivalent to clean_text(line).endswith(","), looking only at the tail of line."""
+    tail = line.rstrip()
+    while tail and tail[-1] in "\"'":
+        tail = tail[:-1].rstrip()
+    return tail.endswith(",")
+
+def iter_csv_events(file_path, parameters_only=False):
+    """Parse a CSV in one pass, yielding ("section", name), ("parameters", row) and ("values", row).
+
+    With parameters_only, value lines are not tokenized and value events carry an empty
+    row, so memory is bounded by the longest merged line rather than by the file size.
+    """
+    current_section = None
+    param_buffer = []
+    value_buffer = []
+    value_pending = False
+    parameter_mode = False
 
-        else:  # Value Line
-            value_buffer.extend(row)
-            if not line.endswith(","):  # End of value block
-                sections[current_section]["values"].append(value_buffer)
-                value_buffer = []
+    with open_text(file_path) as f:
+        for line in iter_merged_lines(f):
+            if parameters_only and not parameter_mode:
+                first_cell = _first_cell(line)
+                if first_cell is None:
+                    continue  # Skip empty lines
+                row = [first_cell]
+                line_continues = _ends_with_comma(line)
+            else:
+                line = clean_text(line)
+                # The line is already cleaned, so its cells only need stripping
+                cells = [cell.strip() for cell in line.split(",")]
+                row = [cell for cell in cells if cell]
+                if not row:
+                    continue  # Skip empty lines
+                line_continues = line.endswith(",")
+
+            if row[0].startswith("@"):  # Section name
+                if current_section and param_buffer:
+                    yield "parameters", param_buffer
+                    param_buffer = []
+
+                if current_section and value_pending:
+                    yield "values", value_buffer
+                    value_buffer = []
+                    value_pending = False
+
+                current_section = intern_name(row[0])
+                parameter_mode = True  # Expect parameters next
+                yield "section", current_section
+
+            elif parameter_mode:  # Parameter Line
+                param_buffer.extend(intern_names(row))
+                if not line_continues:  # End of parameter block
+                    yield "parameters", param_buffer
+                    param_buffer = []
+                    parameter_mode = False  # Switch to value mode
+
+            else:  # Value Line
+                value_pending = True
+                if not parameters_only:
+                    # Blank cells are kept so each value stays under its parameter
+                    value_buffer.extend(cells[:-1] if line_continues else cells)
+                if not line_continues:  # End of value block
+                    yield "values", value_buffer
+                    value_buffer = []
+                    value_pending = False
 
     # Handle leftover buffers
     if current_section and param_buffer:
-        sections[current_section]["parameters"].update(param_buffer)
-    if current_section and value_buffer:
-        sections[current_section]["values"].append(value_buffer)
-
-    return sections
-
-def process_operator(operator_dir):
-    """Process all CSVs for a given operator."""
-    section_counts = collections.defaultdict(int)
-    templates = collections.defaultdict(lambda: collections.defaultdict(set))
-    csv_param_sets = {}
-
-    for root, _, files in os.walk(operator_dir):
-        for file in files:
-            file_path = os.path.join(root, file)
-
-            if file.endswith(".zip"):
-                extract_to = os.path.join(root, file.replace(".zip", ""))
-                extract_zip(file_path, extract_to)
-            
-            elif file.endswith(".csv"):
-                sections = parse_csv(file_path)
-
-                if sections:
-                    first_section = next(iter(sections))
-                    section_counts[first_section] += 1
-
-                    csv_params = set()
-                    for sec, data in sections.items():
-                        templates[sec]["parameters"].update(data["parameters"])
-                        csv_params.update(data["parameters"])
+        yield "parameters", param_buffer
+    if current_section and value_pending:
+        yield "values", value_buffer
+
+def parse_csv(file_path, parameters_only=False):
+    """Parse CSV files while handling multi-line sections, parameters, and values correctly.
+
+    file_path may also be an open text stream, e.g. a ZIP member from iter_zip_csvs.
+    Value rows are stored as ColumnarValues aligned to each parameter line. With
+    parameters_only, sections keep their parameters but no value rows.
+    """
+    sections = collections.defaultdict(lambda: {"parameters": set(), "values": ColumnarValues()})
+    current_section = None
 
-                    csv_param_sets[file] = csv_params  # Store params per CSV
+    for kind, row in iter_csv_events(file_path, parameters_only):
+        if kind == "section":
+            current_section = row
+        elif kind == "parameters":
+            sections[current_section]["parameters"].update(row)
+            if not parameters_only:
+                sections[current_section]["values"].set_header(row)
+        else:
+            section = sections[current_section]  # Value-only sections still count
+            if not parameters_only:
+                section["values"].append(row)
 
-    return section_counts, templates, csv_param_sets
+    return sections
 
-def merge_templates(templates):
+def _load_csvs(file_path, data=None, large_file_size=None, chunk_workers=None):
+    """Parse a CSV, or every CSV inside a ZIP, into (member path, section parameters) pairs.
+
+    The member path is the CSV's path inside the ZIP, or "" for a plain CSV. If the
+    file's bytes were already read, pass them as data and the file is not opened again.
+    Plain CSVs on disk of at least large_file_size bytes are parsed in parallel chunks
+    by parse_large_csv with chunk_workers processes.
+    """
+    source = file_path if data is None else io.BytesIO(data)
+    if file_path.endswith(".zip"):
+        entries = []
+        for member_path, stream in iter_zip_csvs(source):
+            with stream:
+                sections = parse_csv(stream, parameters_only=True)
+            entries.append((member_path, section_parameters(sections)))
+        return entries
+
+    if large_file_size and data is None and os.path.getsize(file_path) >= large_file_size:
+        sections = parse_large_csv(file_path, parse_csv, parameters_only=True, workers=chunk_workers)
+        return [("", section_parameters(sections))]
+    if data is not None:
+        source = io.TextIOWrapper(source, encoding='utf-8')
+    return [("", section_parameters(parse_csv(source, parameters_only=True)))]
+
+def merge_templates(operator_template: OperatorTemplate) -> Dict[str, List[str]]:
     """Merge all section structures into a master template."""
-    return {section: sorted(data["parameters"]) for section, data in templates.items()}
-
-def save_master_template(operator, template, output_dir):
-    """Save master template as a TXT file."""
-    os.makedirs(output_dir, exist_ok=True)
-    file_path = os.path.join(output_dir, f"master_template_{operator}.txt")
-
-    with open(file_path, "w", encoding="utf-8") as f:
-        for section, params in template.items():
-            f.write(f"{section}\n")
-            f.write(", ".join(params) + "\n\n")
-
-    print(f"Master template saved: {file_path}")
-
-def process_all_operators(base_directory, output_dir):
-    """Process each operator and generate master templates."""
-    operator_master_templates = {}
-    operator_section_counts = {}
-    operator_param_sets = {}
-
-    for operator in os.listdir(base_directory):
-        operator_path = os.path.join(base_directory, operator)
-        if os.path.isdir(operator_path):
-            print(f"Processing Operator: {operator}")
-
-            section_counts, templates, csv_param_sets = process_operator(operator_path)
-            operator_master_templates[operator] = merge_templates(templates)
-            operator_section_counts[operator] = section_counts
-            operator_param_sets[operator] = csv_param_sets
-
-            save_master_template(operator, operator_master_templates[operator], output_dir)
-
-    return operator_master_templates, operator_section_counts, operator_param_sets
-
-def merge_global_master(operators_templates):
-    """Combine all operator templates into a single global master template."""
-    global_template = collections.defaultdict(set)
-
-    for templates in operators_templates.values():
-        for section, params in templates.items():
-            global_template[section].update(params)
-
-    return {sec: sorted(params) for sec, params in global_template.items()}
-
-def save_global_master_template(global_template, output_dir):
-    """Save the global master template as a TXT file."""
-    file_path = os.path.join(output_dir, "global_master_template.txt")
-
-    with open(file_path, "w", encoding="utf-8") as f:
-        for section, params in global_template.items():
-            f.write(f"{section}\n")
-            f.write(", ".join(params) + "\n\n")
-
-    print(f"Global master template saved: {file_path}")
-
-def analyze_common_parameters(operator_param_sets):
-    """Analyze and visualize common parameters within each operator and across operators."""
-    operator_common_params = {}
-    global_param_sets = []
-
-    for operator, csv_param_sets in operator_param_sets.items():
-        if csv_param_sets:
-            common_params = set.intersection(*csv_param_sets.values())
-            operator_common_params[operator] = common_params
-            global_param_sets.append(set.union(*csv_param_sets.values()))
-
-    global_common_params = set.intersection(*global_param_sets) if global_param_sets else set()
-    print(f"\nCommon Parameters Across Operators: {len(global_common_params)}")
-
-def analyze_section_distribution(operator_section_counts):
-    """Display section type distribution across operators."""
-    section_df = pd.DataFrame(operator_section_counts).fillna(0).astype(int)
-    print("\n### Section Type Distribution Across Operators ###")
-    print(section_df)
-
-    # Bar plot visualization
-    section_df.T.plot(kind='bar', stacked=True, figsize=(10, 6), colormap="viridis")
-    plt.title("Section Type Distribution Across Operators")
-    plt.xlabel("Operators")
-    plt.ylabel("Section Count")
-    plt.legend(title="Section Type", bbox_to_anchor=(1, 1))
-    plt.show()
-
-def main():
-    base_directory = "path/to/your/directory"  # Change this
-    output_dir = "path/to/output/directory"  # Change this
-
-    operator_templates, operator_counts, operator_param_sets = process_all_operators(base_directory, output_dir)
+    return operator_template.template(sort_parameters=True)
 
-    analyze_common_parameters(operator_param_sets)
-    analyze_section_distribution(operator_counts)
+PIPELINE = TemplatePipeline(PARSE_CACHE_KEY, _load_csvs, parse_csv, merge_templates, sort_parameters=True,
+                            keep_empty_sections=True, large_files=True)
 
-    global_master_template = merge_global_master(operator_templates)
-    save_global_master_template(global_master_template, output_dir)
+def main(argv=None):
+    PIPELINE.main(argv)
 
 if __name__ == "__main__":
     main()
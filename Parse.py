@@ -1,9 +1,6 @@
 import collections
 import csv
-
-def clean_text(text):
-    """Remove unwanted characters and normalize text, removing only newlines within cells."""
-    return text.replace("\r", "").replace("\n", "").replace('"', '').replace("'", "").strip()
+from normalize import clean_text, intern_name
 
 def parse_csv(file_path):
     """Parse CSV while handling multi-line sections, parameters, and values correctly."""
@@ -26,7 +23,7 @@ def parse_csv(file_path):
             if row[0].startswith("@"):  # Section Name
                 if section_data["name"]:  
                     sections.append(section_data)  # Store previous section
-                current_section = row[0]  
+                current_section = intern_name(row[0])  
                 section_data = {"name": current_section, "parameters": [], "values": []}
                 collecting_params = True
                 buffer_params = []  # Reset buffer for parameters
@@ -38,7 +35,7 @@ def parse_csv(file_path):
                     buffer_params = row  # Reset buffer with new parameters
 
                 if not row[-1].endswith(","):  # If last entry doesn't end with a comma, store parameters
-                    section_data["parameters"].extend([p.strip() for p in ",".join(buffer_params).split(",")])
+                    section_data["parameters"].extend([intern_name(p.strip()) for p in ",".join(buffer_params).split(",")])
                     collecting_params = False
                     buffer_params = []  # Reset for values
             else:  # Collecting Values
@@ -1,10 +1,7 @@
 import csv
 import collections
 import re
-
-def clean_text(text):
-    """Remove unwanted characters and normalize text."""
-    return text.strip().replace('"', '').replace("'", "").replace("\t", " ").replace("\n", " ")
+from normalize import clean_text, clean_row, intern_name, intern_names
 
 def parse_csv(file_path):
     """Parse CSV handling multi-line sections and combined section names with parameters."""
@@ -20,36 +17,36 @@ def parse_csv(file_path):
             if not row:
                 continue  # Skip empty rows
 
-            row = [clean_text(cell) for cell in row if cell.strip()]  # Clean and remove empty cells
+            row = clean_row(row)  # Clean and remove empty cells
 
             if not row:
                 continue  # Skip if row becomes empty after cleaning
 
             if row[0].startswith("@"):  # Section Name
                 if buffer:
-                    current_section = clean_text("".join(buffer))
+                    current_section = intern_name(clean_text("".join(buffer)))
                     buffer = []
                 else:
-                    current_section = row[0]
+                    current_section = intern_name(row[0])
 
                 # Check for combined section name and parameters
                 if '##' in current_section:
                     parts = current_section.split('##')
-                    current_section = parts[0]
-                    parameters = parts[1:] + row[1:]
+                    current_section = intern_name(parts[0])
+                    parameters = intern_names(parts[1:] + row[1:])
                     sections[current_section]["parameters"].update(parameters)
                     parameter_mode = False
                 else:
                     parameter_mode = True
             elif parameter_mode:
-                sections[current_section]["parameters"].update(row)
+                sections[current_section]["parameters"].update(intern_names(row))
                 parameter_mode = False
             else:
                 sections[current_section]["values"].append(row)
 
         if buffer:
-            current_section = clean_text("".join(buffer))
-            sections[current_section]["parameters"].update(row)
+            current_section = intern_name(clean_text("".join(buffer)))
+            sections[current_section]["parameters"].update(intern_names(row))
 
     # Convert parameter sets to lists to maintain consistency
     for section in sections:
@@ -1,209 +1,211 @@
-import os  
-import zipfile  
+import re  
+import io  
 import csv  
 import collections  
-import pandas as pd  
-import seaborn as sns  
-import matplotlib.pyplot as plt  
-
-def extract_zip(zip_path, extract_to):  
-    """Extract ZIP file to a directory."""  
-    with zipfile.ZipFile(zip_path, 'r') as zip_ref:  
-        zip_ref.extractall(extract_to)  
-
-def clean_text(text):  
-    """Remove unwanted characters and normalize text."""  
-    return text.strip().replace('"', '').replace("'", "").replace("\t", " ").replace("\n", " ")  
-
-def parse_csv(file_path):  
-    """Parse CSV handling multi-line sections and clean unnecessary delimiters."""  
-    sections = collections.defaultdict(lambda: {"parameters": set(), "values": []})  
+import itertools  
+from typing import Dict, List  
+from normalize import NORMALIZE_VERSION, clean_cells, clean_text, clean_row, intern_name, intern_names  
+from value_profile import ColumnarValues  
+from template_model import OperatorTemplate  
+from template_pipeline import TemplatePipeline, iter_zip_csvs, open_text, section_parameters  
+
+# Names this script's results in a shared --cache database; bump the version when parse output changes  
+PARSE_CACHE_KEY = f"Updatedmaster/1/normalize-{NORMALIZE_VERSION}"  
+
+# Files up to this many characters are read whole and parsed by _parse_bulk. Its text and  
+# line list roughly double a file's footprint, so larger files are streamed instead.  
+BULK_MAX_CHARS = 4 * 1024 * 1024  
+# Matches an opening quote, after a comma or line break, whose cell is still open at the end of its line  
+_QUOTED_NEWLINE = re.compile(r'"(?<=[,\n]")(?:[^"\n]*+"")*+[^"\n]*+\n')  
+
+def parse_csv(file_path, parameters_only=False):  
+    """Parse CSV handling multi-line sections and clean unnecessary delimiters.  
+
+    file_path may also be an open text stream, e.g. a ZIP member from iter_zip_csvs.  
+    Value rows are stored as ColumnarValues aligned to each parameter row, keeping blank  
+    cells so values stay under their parameters. With parameters_only, value rows are  
+    skipped without cleaning their cells.  
+
+    Files of up to BULK_MAX_CHARS are parsed by _parse_bulk; larger files, and files  
+    with quoted cells spanning lines, are streamed through the row parser.  
+    """  
+    with open_text(file_path) as f:  
+        text = f.read(BULK_MAX_CHARS)  
+        if len(text) < BULK_MAX_CHARS:  
+            sections = _parse_bulk(text, parameters_only)  
+            if sections is not None:  
+                return sections  
+            return _parse_rows(io.StringIO(text), parameters_only)  
+        if f.seekable():  
+            f.seek(0)  # Stream the file from the start instead of keeping the text read so far  
+            lines = f  
+        else:  
+            # Finish the current line so the rest of the stream continues on a line boundary  
+            lines = itertools.chain(io.StringIO(text + f.readline()), f)  
+        del text  
+        return _parse_rows(lines, parameters_only)  
+
+def _parse_bulk(text, parameters_only=False):  
+    """Parse a whole CSV text like _parse_rows, or return None if it needs the row parser.  
+
+    Rows are only tokenized where the result depends on them: str.find locates the  
+    lines containing an '@', and those whose first non-blank cell starts with '@' are  
+    the section headers. Each section's parameter row is the next non-blank row; with  
+    parameters_only the value rows after it are never split or cleaned.  
+
+    Rows are split with str.split unless they contain quotes, which csv.reader handles:  
+    line by line with parameters_only, once no quoted cell can span lines, otherwise in  
+    one pass over the whole text.  
+    """  
+    lines = text.split("\n")  
+    if lines[-1] == "":  
+        lines.pop()  
+    if lines and max(map(len, lines)) > csv.field_size_limit():  
+        return None  # Leave csv's field size error to the row parser  
+
+    if '"' not in text:  
+        def row_at(index):  
+            return lines[index].split(",")  
+    elif parameters_only:  
+        if _QUOTED_NEWLINE.search("\n" + text):  
+            return None  # A quoted cell may span lines  
+        def row_at(index):  
+            line = lines[index]  
+            return next(csv.reader([line]), []) if '"' in line else line.split(",")  
+    else:  
+        rows = list(csv.reader(io.StringIO(text)))  
+        if len(rows) != len(lines):  
+            return None  # A quoted cell spans lines  
+        row_at = rows.__getitem__  
+
+    headers = []  
+    line_index = line_start = 0  
+    at = text.find("@")  
+    while at != -1:  
+        start = text.rfind("\n", 0, at) + 1  
+        line_index += text.count("\n", line_start, start)  
+        line_start = start  
+        first_cell = next((cell for cell in row_at(line_index) if cell.strip()), None)  
+        if first_cell is not None:  
+            first_cell = clean_text(first_cell)  
+            if first_cell.startswith("@"):  
+                headers.append((line_index, intern_name(first_cell)))  
+        end = text.find("\n", at)  
+        at = text.find("@", end) if end != -1 else -1  
+
+    sections = collections.defaultdict(lambda: {"parameters": {}, "values": ColumnarValues()})  
+    ends = [start for start, _ in headers[1:]] + [len(lines)]  
+
+    # Rows before the first header go to the None section, as in _parse_rows  
+    first_header = headers[0][0] if headers else len(lines)  
+    if parameters_only:  
+        if any(cell.strip() for index in range(first_header) for cell in row_at(index)):  
+            sections[None]  # Value-only sections still count  
+    else:  
+        for index in range(first_header):  
+            row = row_at(index)  
+            if any(cell.strip() for cell in row):  
+                sections[None]["values"].append(clean_cells(row))  
+
+    for (start, section), end in zip(headers, ends):  
+        for index in range(start + 1, end):  
+            row = clean_row(row_at(index))  
+            if row:  
+                break  
+        else:  
+            continue  # No parameter row before the next header  
+
+        row = intern_names(row)  
+        sections[section]["parameters"].update(dict.fromkeys(row))  
+        if not parameters_only:  
+            values = sections[section]["values"]  
+            values.set_header(row)  
+            for index in range(index + 1, end):  
+                row = row_at(index)  
+                if any(cell.strip() for cell in row):  
+                    values.append(clean_cells(row))  
+
+    return sections  
+
+def _parse_rows(lines, parameters_only=False):  
+    """Row-by-row parser behind parse_csv: tokenize lines with csv.reader and classify each row."""  
+    sections = collections.defaultdict(lambda: {"parameters": {}, "values": ColumnarValues()})  
     current_section = None  
     parameter_mode = False  
     buffer = []  
 
-    with open(file_path, 'r', encoding='utf-8') as f:  
-        reader = csv.reader(f)  
+    for row in csv.reader(lines):  
+        if not row:  
+            continue  
 
-        for row in reader:  
-            if not row:  
+        if parameters_only and not parameter_mode:  
+            first_cell = next((cell for cell in row if cell.strip()), None)  
+            if first_cell is None:  
+                continue  
+            if not clean_text(first_cell).startswith("@"):  
+                sections[current_section]  # Value-only sections still count  
                 continue  
 
-            row = [clean_text(cell) for cell in row if cell.strip()]  
+        if parameters_only:  
+            row = clean_row(row)  
+        else:  
+            cells = clean_cells(row)  
+            row = [cell for cell, raw in zip(cells, row) if raw.strip()]  # As clean_row  
 
-            if not row:  
-                continue  
+        if not row:  
+            continue  
 
-            if row[0].startswith("@"):  
-                if buffer:  
-                    current_section = clean_text("".join(buffer))  
-                    buffer = []  
-                else:  
-                    current_section = row[0]  
-
-                parameter_mode = True  
-            elif parameter_mode:  
-                sections[current_section]["parameters"].update(row)  
-                parameter_mode = False  
+        if row[0].startswith("@"):  
+            if buffer:  
+                current_section = intern_name(clean_text("".join(buffer)))  
+                buffer = []  
             else:  
-                sections[current_section]["values"].append(row)  
-
-        if buffer:  
-            current_section = clean_text("".join(buffer))  
-            sections[current_section]["parameters"].update(row)  
+                current_section = intern_name(row[0])  
+
+            parameter_mode = True  
+        elif parameter_mode:  
+            row = intern_names(row)  
+            sections[current_section]["parameters"].update(dict.fromkeys(row))  
+            if not parameters_only:  
+                sections[current_section]["values"].set_header(row)  
+            parameter_mode = False  
+        else:  
+            sections[current_section]["values"].append(cells)  
+
+    if buffer:  
+        current_section = intern_name(clean_text("".join(buffer)))  
+        sections[current_section]["parameters"].update(dict.fromkeys(row))  
 
     return sections  
 
-def process_operator(operator_dir):  
-    """Process all CSVs for a given operator."""  
-    section_counts = collections.defaultdict(int)  
-    templates = collections.defaultdict(lambda: collections.defaultdict(set))  
-    csv_param_sets = {}  
-
-    for root, _, files in os.walk(operator_dir):  
-        for file in files:  
-            file_path = os.path.join(root, file)  
-
-            if file.endswith(".zip"):  
-                extract_to = os.path.join(root, file.replace(".zip", ""))  
-                extract_zip(file_path, extract_to)  
-              
-            elif file.endswith(".csv"):  
-                sections = parse_csv(file_path)  
-
-                if sections:  
-                    first_section = next(iter(sections))  
-                    section_counts[first_section] += 1  
-
-                    csv_params = set()  
-                    for sec, data in sections.items():  
-                        templates[sec]["parameters"].update(data["parameters"])  
-                        csv_params.update(data["parameters"])  
-
-                    csv_param_sets[file] = csv_params  
-
-    return section_counts, templates, csv_param_sets  
-
-def merge_templates(templates):  
-    """Merge all section structures into a master template."""  
-    return {section: list(data["parameters"]) for section, data in templates.items()}  
-
-def save_master_template(operator, template, output_dir):  
-    """Save master template as a TXT file."""  
-    os.makedirs(output_dir, exist_ok=True)  
-    file_path = os.path.join(output_dir, f"master_template_{operator}.txt")  
-
-    with open(file_path, "w", encoding="utf-8") as f:  
-        for section, params in template.items():  
-            f.write(f"{section}\n")  
-            f.write(", ".join(params) + "\n\n")  
-
-    print(f"Master template saved: {file_path}")  
-
-def process_all_operators(base_directory, output_dir):  
-    """Process each operator and generate master templates."""  
-    operator_master_templates = {}  
-    operator_section_counts = {}  
-    operator_param_sets = {}  
-
-    for operator in os.listdir(base_directory):  
-        operator_path = os.path.join(base_directory, operator)  
-        if os.path.isdir(operator_path):  
-            print(f"Processing Operator: {operator}")  
-
-            section_counts, templates, csv_param_sets = process_operator(operator_path)  
-            operator_master_templates[operator] = merge_templates(templates)  
-            operator_section_counts[operator] = section_counts  
-            operator_param_sets[operator] = csv_param_sets  
-
-            save_master_template(operator, operator_master_templates[operator], output_dir)  
-
-    return operator_master_templates, operator_section_counts, operator_param_sets  
-
-def merge_global_master(operators_templates):  
-    """Combine all operator templates into a single global master template without sorting or duplicates."""  
-    global_template = collections.defaultdict(list)  
-
-    for templates in operators_templates.values():  
-        for section, params in templates.items():  
-            seen = set(global_template[section])  
-            for param in params:  
-                if param not in seen:  
-                    global_template[section].append(param)  
-                    seen.add(param)  
-
-    return dict(global_template)  
-
-def save_global_master_template(global_template, output_dir):  
-    """Save the global master template as a TXT file, preserving order."""  
-    file_path = os.path.join(output_dir, "global_master_template.txt")  
-
-    with open(file_path, "w", encoding="utf-8") as f:  
-        for section, params in global_template.items():  
-            f.write(f"{section}\n")  
-            f.write(", ".join(params) + "\n\n")  
-
-    print(f"Global master template saved: {file_path}")  
-
-def analyze_common_parameters(operator_param_sets):  
-    """Analyze and visualize common parameters within each operator and across operators."""  
-    operator_common_params = {}  
-    global_param_sets = []  
-
-    for operator, csv_param_sets in operator_param_sets.items():  
-        if csv_param_sets:  
-            common_params = set.intersection(*csv_param_sets.values())  
-            operator_common_params[operator] = common_params  
-            global_param_sets.append(set.union(*csv_param_sets.values()))  
-
-            print(f"\nOperator: {operator}")  
-            print("Total Parameters per CSV:")  
-            for csv_file, param_set in csv_param_sets.items():  
-                print(f"{csv_file}: {len(param_set)}")  
-
-            print(f"Common Parameters in all CSVs: {len(common_params)}\n")  
-
-            plt.figure(figsize=(8, 6))  
-            csv_files = list(csv_param_sets.keys())  
-            param_matrix = [[len(csv_param_sets[f1] & csv_param_sets[f2]) for f2 in csv_files] for f1 in csv_files]  
-            sns.heatmap(param_matrix, annot=True, cmap="Blues", xticklabels=csv_files, yticklabels=csv_files)  
-            plt.title(f"Parameter Similarity Heatmap - {operator}")  
-            plt.xlabel("CSV Files")  
-            plt.ylabel("CSV Files")  
-            plt.show()  
-
-    global_common_params = set.intersection(*global_param_sets) if global_param_sets else set()  
-    print("\n### Global Common Parameters Across All Operators ###")  
-    print("Total Unique Parameters Per Operator:")  
-    for operator, param_set in operator_common_params.items():  
-        print(f"{operator}: {len(param_set)}")  
-
-    print(f"Common Parameters Across Operators: {len(global_common_params)}")  
-
-def analyze_section_distribution(operator_section_counts):  
-    """Display section type distribution across operators."""  
-    section_df = pd.DataFrame(operator_section_counts).fillna(0).astype(int)  
-    print("\n### Section Type Distribution Across Operators ###")  
-    print(section_df)  
-
-    section_df.T.plot(kind='bar', stacked=True, figsize=(10, 6), colormap="viridis")  
-    plt.title("Section Type Distribution Across Operators")  
-    plt.xlabel("Operators")  
-    plt.ylabel("Section Count")  
-    plt.legend(title="Section Type", bbox_to_anchor=(1, 1))  
-    plt.show()  
-
-def main():  
-    base_directory = "path/to/your/directory"  
-    output_dir = "path/to/output/directory"  
-
-    operator_templates, operator_counts, operator_param_sets = process_all_operators(base_directory, output_dir)  
-
-    analyze_common_parameters(operator_param_sets)  
-    analyze_section_distribution(operator_counts)  
-
-    global_master_template = merge_global_master(operator_templates)  
-    save_global_master_template(global_master_template, output_dir)  
+def _load_csvs(file_path, data=None):  
+    """Parse a CSV, or every CSV inside a ZIP, into (member path, section parameters) pairs.  
+
+    The member path is the CSV's path inside the ZIP, or "" for a plain CSV. If the  
+    file's bytes were already read, pass them as data and the file is not opened again.  
+    """  
+    source = file_path if data is None else io.BytesIO(data)  
+    if file_path.endswith(".zip"):  
+        entries = []  
+        for member_path, stream in iter_zip_csvs(source):  
+            with stream:  
+                sections = parse_csv(stream, parameters_only=True)  
+            entries.append((member_path, section_parameters(sections)))  
+        return entries  
+
+    if data is not None:  
+        source = io.TextIOWrapper(source, encoding='utf-8')  
+    return [("", section_parameters(parse_csv(source, parameters_only=True)))]  
+
+def merge_templates(operator_template: OperatorTemplate) -> Dict[str, List[str]]:  
+    """Merge all section structures into a master template, keeping first-seen parameter order."""  
+    return operator_template.template()  
+
+PIPELINE = TemplatePipeline(PARSE_CACHE_KEY, _load_csvs, parse_csv, merge_templates, sort_parameters=False,  
+                            keep_empty_sections=True, operator_details=True)  
+
+def main(argv=None):  
+    PIPELINE.main(argv)  
 
 if __name__ == "__main__":  
     main()
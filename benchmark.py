@@ -0,0 +1,273 @@
+import os
+import io
+import ast
+import sys
+import json
+import time
+import random
+import zipfile
+import argparse
+import platform
+import resource
+import contextlib
+import subprocess
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Parser name -> source file defining parse_csv
+PARSERS = {
+    "Mastertemplate": "Mastertemplate.py",
+    "Updatedmaster": "Updatedmaster.py",
+    "UpdatedPasre": "UpdatedPasre.py",
+    "Parse": "Parse.py",
+    "Parse2": "Parse2",
+}
+
+# Pipelines with a process_all_operators entry point
+PIPELINES = ["Mastertemplate", "Updatedmaster"]
+
+def _csv_text(rng, sections, params_per_section, rows_per_section, multiline_fraction, hash_header_fraction):
+    """Build one synthetic CSV with @ sections, parameter lines and value rows."""
+    lines = []
+    for index in range(sections):
+        section = f"@SECTION_{rng.randrange(sections * 2)}"
+        params = [f"param_{rng.randrange(params_per_section * 4)}" for _ in range(params_per_section)]
+
+        if rng.random() < hash_header_fraction:
+            split = rng.randint(1, len(params))
+            lines.append("##".join([section] + params[:split]) + "," + ",".join(params[split:]))
+        else:
+            lines.append(section)
+            if rng.random() < multiline_fraction and len(params) > 1:
+                split = rng.randint(1, len(params) - 1)
+                lines.append(",".join(params[:split]) + ",")
+                lines.append(",".join(params[split:]))
+            else:
+                lines.append(",".join(params))
+
+        for _ in range(rows_per_section):
+            lines.append(",".join(f'"{rng.randrange(1000)}"' if rng.random() < 0.2 else str(rng.randrange(1000))
+                                  for _ in params))
+        if index % 3 == 2:
+            lines.append("")
+
+    return "\n".join(lines) + "\n"
+
+def generate_corpus(base_dir, seed=0, operators=4, files_per_operator=50, sections=10, params_per_section=12,
+                    rows_per_section=20, multiline_fraction=0.2, hash_header_fraction=0.1, zip_fraction=0.2):
+    """Write a seeded synthetic operator tree under base_dir and return its manifest.
+
+    A zip_fraction of each operator's CSVs is packed into one ZIP, half of them inside a
+    nested ZIP. The manifest records the generation settings and corpus totals.
+    """
+    rng = random.Random(seed)
+    manifest = {
+        "seed": seed, "operators": operators, "files_per_operator": files_per_operator, "sections": sections,
+        "params_per_section": params_per_section, "rows_per_section": rows_per_section,
+        "multiline_fraction": multiline_fraction, "hash_header_fraction": hash_header_fraction,
+        "zip_fraction": zip_fraction, "csv_files": 0, "zipped_csv_files": 0, "csv_bytes": 0,
+    }
+
+    for operator_index in range(operators):
+        operator_dir = os.path.join(base_dir, f"operator_{operator_index:03d}")
+        zipped = []
+
+        for file_index in range(files_per_operator):
+            text = _csv_text(rng, sections, params_per_section, rows_per_section,
+                             multiline_fraction, hash_header_fraction)
+            name = f"dump_{file_index:05d}.csv"
+            manifest["csv_files"] += 1
+            manifest["csv_bytes"] += len(text.encode("utf-8"))
+
+            if rng.random() < zip_fraction:
+                zipped.append((name, text))
+                manifest["zipped_csv_files"] += 1
+                continue
+
+            sub_dir = os.path.join(operator_dir, f"batch_{file_index % 4}")
+            os.makedirs(sub_dir, exist_ok=True)
+            with open(os.path.join(sub_dir, name), "w", encoding="utf-8") as f:
+                f.write(text)
+
+        if zipped:
+            os.makedirs(operator_dir, exist_ok=True)
+            half = len(zipped) // 2
+            with zipfile.ZipFile(os.path.join(operator_dir, "archive.zip"), "w", zipfile.ZIP_DEFLATED) as zip_ref:
+                for name, text in zipped[half:]:
+                    zip_ref.writestr(f"export/{name}", text)
+                if half:
+                    nested = io.BytesIO()
+                    with zipfile.ZipFile(nested, "w", zipfile.ZIP_DEFLATED) as nested_ref:
+                        for name, text in zipped[:half]:
+                            nested_ref.writestr(name, text)
+                    zip_ref.writestr("nested.zip", nested.getvalue())
+
+    with open(os.path.join(base_dir, "corpus.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+def load_parse_csv(name):
+    """Load parse_csv from a parser file, executing only its imports, definitions and constants.
+
+    Parse2 runs an example at import time, so module bodies are never executed as-is.
+    Constants are module-level assignments to UPPER_CASE names, optionally underscore-prefixed.
+    """
+    path = os.path.join(REPO_DIR, PARSERS[name])
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+
+    def is_constant(node):
+        return isinstance(node, ast.Assign) and all(
+            isinstance(target, ast.Name) and target.id.lstrip("_").isupper() for target in node.targets)
+
+    tree.body = [node for node in tree.body
+                 if isinstance(node, (ast.Import, ast.ImportFrom, ast.FunctionDef, ast.ClassDef)) or is_constant(node)]
+    namespace = {"__name__": f"benchmark_{name}", "__file__": path}
+    exec(compile(tree, path, "exec"), namespace)
+    return namespace["parse_csv"]
+
+def _peak_rss_mb():
+    """Peak RSS of this process and its children, in MB."""
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak / scale
+
+def _run_parser(name, files):
+    """Parse every file with one parser; runs in a fresh process so peak RSS is per parser."""
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+    parse_csv = load_parse_csv(name)
+
+    start = time.perf_counter()
+    for file_path in files:
+        parse_csv(file_path)
+    return time.perf_counter() - start, _peak_rss_mb()
+
+def _run_pipeline(name, base_directory, output_dir, workers):
+    """Run one pipeline's process_all_operators end to end in a fresh process."""
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+    module = importlib.import_module(name)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        module.process_all_operators(base_directory, output_dir, workers)
+    return time.perf_counter() - start, _peak_rss_mb()
+
+def _measure(func, *args):
+    """Run func in a fresh spawned process and return (seconds, peak_rss_mb, error)."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        try:
+            seconds, peak_rss_mb = executor.submit(func, *args).result()
+        except Exception as e:
+            return None, None, f"{type(e).__name__}: {e}"
+    return seconds, peak_rss_mb, None
+
+def _result(kind, name, files, size, seconds, peak_rss_mb, error):
+    result = {"kind": kind, "name": name, "files": files, "bytes": size, "seconds": seconds,
+              "peak_rss_mb": peak_rss_mb, "error": error, "files_per_sec": None, "mb_per_sec": None}
+    if seconds:
+        result["files_per_sec"] = files / seconds
+        result["mb_per_sec"] = size / (1024 * 1024) / seconds
+    return result
+
+def run_benchmarks(corpus_dir, output_dir, parsers=None, pipelines=None, workers=1, repeat=1):
+    """Benchmark each parser on the corpus's loose CSVs and each pipeline end to end."""
+    with open(os.path.join(corpus_dir, "corpus.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    files = []
+    for root, dirs, names in os.walk(corpus_dir):
+        dirs.sort()
+        files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith(".csv"))
+    size = sum(os.path.getsize(file_path) for file_path in files)
+
+    results = []
+    for name in parsers or list(PARSERS):
+        for _ in range(repeat):
+            seconds, peak_rss_mb, error = _measure(_run_parser, name, files)
+            results.append(_result("parser", name, len(files), size, seconds, peak_rss_mb, error))
+
+    for name in pipelines or PIPELINES:
+        for _ in range(repeat):
+            seconds, peak_rss_mb, error = _measure(_run_pipeline, name, corpus_dir,
+                                                   os.path.join(output_dir, name), workers)
+            results.append(_result("pipeline", name, manifest["csv_files"], manifest["csv_bytes"],
+                                   seconds, peak_rss_mb, error))
+
+    return {"corpus": manifest, "environment": _environment(), "workers": workers, "results": results}
+
+def _environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "platform": platform.platform(),
+            "cpus": os.cpu_count()}
+
+def print_report(report, baseline=None):
+    """Print a results table, with throughput change against a baseline report if given."""
+    previous = {}
+    for result in (baseline or {}).get("results", []):
+        previous.setdefault((result["kind"], result["name"]), result)
+
+    print(f"{'kind':<9} {'name':<15} {'files/s':>10} {'MB/s':>8} {'peak MB':>8} {'vs base':>8}")
+    for result in report["results"]:
+        if result["error"]:
+            print(f"{result['kind']:<9} {result['name']:<15} FAILED: {result['error']}")
+            continue
+
+        change = ""
+        old = previous.get((result["kind"], result["name"]))
+        if old and old.get("files_per_sec"):
+            change = f"{result['files_per_sec'] / old['files_per_sec'] - 1:+.1%}"
+        print(f"{result['kind']:<9} {result['name']:<15} {result['files_per_sec']:>10.1f} "
+              f"{result['mb_per_sec']:>8.2f} {result['peak_rss_mb']:>8.1f} {change:>8}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the CSV parsers and template pipelines.")
+    parser.add_argument("corpus_dir", help="Corpus directory; generated if it has no corpus.json")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write JSON results")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    parser.add_argument("--parsers", nargs="*", choices=list(PARSERS), help="Parsers to benchmark")
+    parser.add_argument("--pipelines", nargs="*", choices=PIPELINES, help="Pipelines to benchmark")
+    parser.add_argument("--workers", type=int, default=1, help="Workers for process_all_operators")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--operators", type=int, default=4)
+    parser.add_argument("--files", type=int, default=50, help="CSV files per operator")
+    parser.add_argument("--sections", type=int, default=10)
+    parser.add_argument("--params", type=int, default=12, help="Parameters per section")
+    parser.add_argument("--rows", type=int, default=20, help="Value rows per section")
+    parser.add_argument("--multiline-fraction", type=float, default=0.2)
+    parser.add_argument("--hash-header-fraction", type=float, default=0.1)
+    parser.add_argument("--zip-fraction", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(os.path.join(args.corpus_dir, "corpus.json")):
+        print(f"Generating corpus: {args.corpus_dir}")
+        generate_corpus(args.corpus_dir, args.seed, args.operators, args.files, args.sections, args.params,
+                        args.rows, args.multiline_fraction, args.hash_header_fraction, args.zip_fraction)
+
+    output_dir = os.path.join(os.path.dirname(os.path.abspath(args.output)), "bench_templates")
+    report = run_benchmarks(args.corpus_dir, output_dir, args.parsers, args.pipelines, args.workers, args.repeat)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Benchmark results saved: {args.output}")
+
+if __name__ == "__main__":
+    main()
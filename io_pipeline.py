@@ -0,0 +1,154 @@
+import os
+import queue
+import threading
+
+_DONE = object()
+# Default cap on the bytes of files read but not yet handed back to the caller
+MAX_BYTES = 256 * 1024 * 1024
+QUEUE_SIZE = 64
+
+def read_bytes(file_path):
+    with open(file_path, 'rb') as f:
+        return f.read()
+
+def run_pipeline(paths, parse, readers=4, parsers=1, queue_size=QUEUE_SIZE, max_bytes=MAX_BYTES, lookup=None,
+                 max_read=None):
+    """Scan, read and parse files in overlapping stages, yielding (path, result) in scan order.
+
+    A scanner thread pulls paths from the paths iterable, `readers` threads read each
+    file into memory and `parsers` threads call parse(path, data). The stages are joined
+    by queues of queue_size items, and the files between the scanner and the caller hold
+    at most max_bytes bytes at any time, so memory stays capped even when one file is slow
+    to read. A larger file is only admitted once nothing else is in flight.
+
+    lookup(path), if given, is called by the scanner before a file is read; a result
+    other than None is yielded as the file's result without reading or parsing it. Files
+    of at least max_read bytes are not read: parse gets data=None and reads them itself.
+    Exceptions raised in any stage are re-raised in the caller.
+    """
+    if readers < 1 or parsers < 1:
+        raise ValueError("run_pipeline needs at least one reader and one parser")
+
+    path_queue = queue.Queue(queue_size)
+    data_queue = queue.Queue(queue_size)
+    result_queue = queue.Queue()
+    budget = threading.Condition()
+    in_flight = [0]
+    stop = threading.Event()
+    readers_left = [readers]
+    readers_lock = threading.Lock()
+
+    def put(target, item):
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(source):
+        while not stop.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def reserve(size):
+        with budget:
+            while in_flight[0] and in_flight[0] + size > max_bytes:
+                if stop.is_set():
+                    return False
+                budget.wait(0.1)
+            in_flight[0] += size
+            return True
+
+    def release(size):
+        with budget:
+            in_flight[0] -= size
+            budget.notify_all()
+
+    def scan():
+        try:
+            for seq, path in enumerate(paths):
+                result = lookup(path) if lookup else None
+                if result is not None:
+                    result_queue.put((seq, path, result, 0))
+                    continue
+                size = os.path.getsize(path)
+                read = max_read is None or size < max_read
+                if not read:
+                    size = 0  # parse reads the file itself
+                if not reserve(size):
+                    return
+                if not put(path_queue, (seq, path, size, read)):
+                    return
+        except BaseException as e:
+            result_queue.put((None, None, e, 0))
+        finally:
+            for _ in range(readers):
+                put(path_queue, _DONE)
+
+    def read():
+        try:
+            while True:
+                item = get(path_queue)
+                if item is _DONE:
+                    break
+                seq, path, size, read = item
+                data = read_bytes(path) if read else None
+                if not put(data_queue, (seq, path, size, data)):
+                    return
+        except BaseException as e:
+            result_queue.put((None, None, e, 0))
+        finally:
+            with readers_lock:
+                readers_left[0] -= 1
+                last_reader = readers_left[0] == 0
+            if last_reader:
+                for _ in range(parsers):
+                    put(data_queue, _DONE)
+
+    def parse_stage():
+        try:
+            while True:
+                item = get(data_queue)
+                if item is _DONE:
+                    break
+                seq, path, size, data = item
+                result_queue.put((seq, path, parse(path, data), size))
+        except BaseException as e:
+            result_queue.put((None, None, e, 0))
+        finally:
+            result_queue.put(_DONE)
+
+    threads = [threading.Thread(target=scan, daemon=True)]
+    threads += [threading.Thread(target=read, daemon=True) for _ in range(readers)]
+    threads += [threading.Thread(target=parse_stage, daemon=True) for _ in range(parsers)]
+    for thread in threads:
+        thread.start()
+
+    pending = {}
+    next_seq = 0
+    parsers_left = parsers
+    try:
+        while parsers_left:
+            item = result_queue.get()
+            if item is _DONE:
+                parsers_left -= 1
+                continue
+
+            seq, path, result, size = item
+            if seq is None:
+                raise result
+            pending[seq] = (path, result, size)
+            while next_seq in pending:
+                path, result, size = pending.pop(next_seq)
+                yield path, result
+                next_seq += 1
+                release(size)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
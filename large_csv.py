@@ -0,0 +1,72 @@
+import io
+import os
+import mmap
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
+MIN_CHUNK_SIZE = 1 << 20
+
+def section_chunks(file_path, chunk_size):
+    """Split a file into (start, end) byte ranges that each begin at a line starting with '@'.
+
+    Boundaries are found with mmap.find, so only the bytes around each boundary are
+    scanned from Python; chunks are at least chunk_size bytes except the last.
+    """
+    size = os.path.getsize(file_path)
+    if size == 0:
+        return [(0, 0)]
+
+    starts = [0]
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # A value line continued before the first section is carried into that section,
+        # so the first chunk always extends past the first '@' line
+        first = 0 if mm[:1] == b"@" else mm.find(b"\n@")
+        search_from = max(chunk_size - 1, first + 1) if first != -1 else size
+        while True:
+            pos = mm.find(b"\n@", search_from)
+            if pos == -1:
+                break
+            starts.append(pos + 1)
+            search_from = pos + chunk_size
+
+    return list(zip(starts, starts[1:] + [size]))
+
+def _parse_chunk(file_path, parse, parameters_only, chunk):
+    """Parse one byte range of a file with parse and return a picklable sections dict."""
+    start, end = chunk
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data = mm[start:end]
+    return dict(parse(io.TextIOWrapper(io.BytesIO(data), encoding='utf-8'), parameters_only))
+
+def merge_sections(chunk_sections):
+    """Merge per-chunk parse results in file order into one {section: data} mapping."""
+    sections = {}
+    for chunk in chunk_sections:
+        for section, data in chunk.items():
+            if section not in sections:
+                sections[section] = data
+                continue
+            sections[section]["parameters"].update(data["parameters"])
+            sections[section]["values"].extend(data["values"])
+    return sections
+
+def parse_large_csv(file_path, parse, parameters_only=False, workers=None, chunk_size=None):
+    """Parse a large CSV in parallel chunks split at '@' section lines.
+
+    parse is a line-based parse_csv whose state is fully reset by a line starting with
+    '@', so parsing each chunk on its own and merging the results in order gives the
+    same sections, parameters and value rows as a serial parse, including parameter
+    lines continued across physical lines. It must be a module-level function so that
+    it can be sent to the worker processes.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or max(os.path.getsize(file_path) // (workers * 4), MIN_CHUNK_SIZE)
+    chunks = section_chunks(file_path, chunk_size)
+    task = functools.partial(_parse_chunk, file_path, parse, parameters_only)
+
+    if len(chunks) == 1:
+        return dict(parse(file_path, parameters_only))
+    if workers == 1:
+        return merge_sections(map(task, chunks))
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        return merge_sections(executor.map(task, chunks))
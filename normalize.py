@@ -0,0 +1,33 @@
+import sys
+
+# Bump whenever cleaned names change, so parse results cached under older rules are not reused
+NORMALIZE_VERSION = 2
+
+# Indexed by code point: quotes and carriage returns are dropped, tabs and newlines inside a
+# cell become spaces. A list lookup per character is much cheaper than the dict built by
+# str.maketrans, and code points past the end raise IndexError, which translate() keeps as-is.
+_CLEAN_TABLE = [chr(code) for code in range(128)]
+for char in "\"'\r":
+    _CLEAN_TABLE[ord(char)] = None
+for char in "\t\n":
+    _CLEAN_TABLE[ord(char)] = " "
+
+def clean_text(text):
+    """Remove quotes and line breaks from a cell and strip the surrounding whitespace."""
+    return text.translate(_CLEAN_TABLE).strip()
+
+def clean_row(cells):
+    """clean_text every non-blank cell of a row, dropping blank ones; inlined for the tokenizing loops."""
+    return [cell.translate(_CLEAN_TABLE).strip() for cell in cells if cell.strip()]
+
+def clean_cells(cells):
+    """clean_text every cell of a value row, keeping blank ones as "" so cells stay under their parameters."""
+    return [cell.translate(_CLEAN_TABLE).strip() for cell in cells]
+
+def intern_name(name):
+    """Return the run-wide shared copy of a cleaned section or parameter name."""
+    return sys.intern(name)
+
+def intern_names(names):
+    """Intern a row of cleaned parameter names, so repeated names across files share one object."""
+    return list(map(sys.intern, names))
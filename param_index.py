@@ -0,0 +1,155 @@
+import sys
+import sqlite3
+import argparse
+
+# CSVs whose postings callers streaming an operator's files write per add_files transaction
+BATCH_FILES = 500
+
+class ParameterIndex:
+    """SQLite inverted index from parameter to (operator, section, relative file path).
+
+    Names are stored once in lookup tables and postings reference them by id, so the
+    index stays compact and a parameter lookup is a single indexed join.
+    """
+
+    def __init__(self, index_path):
+        self.conn = sqlite3.connect(index_path, timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS parameters (id INTEGER PRIMARY KEY, name TEXT UNIQUE);
+            CREATE TABLE IF NOT EXISTS sections (id INTEGER PRIMARY KEY, name TEXT UNIQUE);
+            CREATE TABLE IF NOT EXISTS files (id INTEGER PRIMARY KEY, operator TEXT, path TEXT, size INTEGER,
+                                              mtime_ns INTEGER, UNIQUE (operator, path));
+            CREATE TABLE IF NOT EXISTS postings (parameter_id INTEGER, section_id INTEGER, file_id INTEGER);
+            CREATE INDEX IF NOT EXISTS postings_by_parameter ON postings (parameter_id, section_id);
+            CREATE INDEX IF NOT EXISTS postings_by_file ON postings (file_id);
+        """)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(files)")}
+        for column in ("size", "mtime_ns"):
+            if column not in columns:  # Indexes written before files were stamped
+                self.conn.execute(f"ALTER TABLE files ADD COLUMN {column} INTEGER")
+        self._ids = {"parameters": {}, "sections": {}}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _id(self, table, name):
+        ids = self._ids[table]
+        if name not in ids:
+            self.conn.execute(f"INSERT OR IGNORE INTO {table} (name) VALUES (?)", (name,))
+            ids[name] = self.conn.execute(f"SELECT id FROM {table} WHERE name = ?", (name,)).fetchone()[0]
+        return ids[name]
+
+    def remove_operator(self, operator):
+        """Delete every posting recorded for an operator."""
+        with self.conn:
+            self.conn.execute("DELETE FROM postings WHERE file_id IN (SELECT id FROM files WHERE operator = ?)",
+                              (operator,))
+            self.conn.execute("DELETE FROM files WHERE operator = ?", (operator,))
+
+    def remove_files(self, operator, paths):
+        """Delete the entries of an operator's CSVs at paths, and of the members of ZIPs at paths, in one transaction."""
+        with self.conn:
+            for path in paths:
+                # ZIP members are stored as "<zip path>/<member path>"; "0" sorts right after "/"
+                file_ids = self.conn.execute(
+                    "SELECT id FROM files WHERE operator = ? AND (path = ? OR (path > ? AND path < ?))",
+                    (operator, path, path + "/", path + "0")).fetchall()
+                self.conn.executemany("DELETE FROM postings WHERE file_id = ?", file_ids)
+                self.conn.executemany("DELETE FROM files WHERE id = ?", file_ids)
+
+    def remove_file(self, operator, path):
+        """Delete the entry of one CSV, or of every member of a ZIP, of an operator."""
+        self.remove_files(operator, [path])
+
+    def add_files(self, operator, files, stamps=None):
+        """Record the {section: parameters} of (path, section_params) CSVs of an operator in one transaction.
+
+        Each CSV replaces any earlier entry for its path. stamps maps paths to the (size, mtime_ns)
+        of the file they were parsed from, returned by stamps() so unchanged files can be skipped.
+        """
+        stamps = stamps or {}
+        postings = []
+        with self.conn:
+            for path, section_params in files:
+                size, mtime_ns = stamps.get(path, (None, None))
+                self.conn.execute("INSERT OR IGNORE INTO files (operator, path) VALUES (?, ?)", (operator, path))
+                file_id = self.conn.execute("SELECT id FROM files WHERE operator = ? AND path = ?",
+                                            (operator, path)).fetchone()[0]
+                self.conn.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE id = ?", (size, mtime_ns, file_id))
+                self.conn.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+                postings.extend((self._id("parameters", param), self._id("sections", section), file_id)
+                                for section, params in section_params.items() for param in params)
+            self.conn.executemany("INSERT INTO postings VALUES (?, ?, ?)", postings)
+
+    def add_file(self, operator, path, section_params):
+        """Record the {section: parameters} of one CSV, replacing any earlier entry for it."""
+        self.add_files(operator, [(path, section_params)])
+
+    def stamps(self, operator):
+        """Return {path: (size, mtime_ns)} for an operator's CSVs, with (None, None) for unstamped ones."""
+        return {path: (size, mtime_ns) for path, size, mtime_ns in self.conn.execute(
+            "SELECT path, size, mtime_ns FROM files WHERE operator = ?", (operator,))}
+
+    def operators(self):
+        """Return the operators that have files in the index."""
+        return [operator for (operator,) in self.conn.execute("SELECT DISTINCT operator FROM files ORDER BY operator")]
+
+    def lookup(self, parameter, section=None, operator=None):
+        """Return sorted (operator, section, path) rows where a parameter is used."""
+        query = ("SELECT f.operator, s.name, f.path FROM postings p "
+                 "JOIN parameters pa ON pa.id = p.parameter_id "
+                 "JOIN sections s ON s.id = p.section_id "
+                 "JOIN files f ON f.id = p.file_id WHERE pa.name = ?")
+        args = [parameter]
+        if section is not None:
+            query += " AND s.name = ?"
+            args.append(section)
+        if operator is not None:
+            query += " AND f.operator = ?"
+            args.append(operator)
+        return sorted(self.conn.execute(query, args).fetchall())
+
+    def required_parameters(self, operator=None):
+        """Return {section: parameters used by every indexed file that lists parameters for it}."""
+        joins = " FROM postings p JOIN sections s ON s.id = p.section_id JOIN files f ON f.id = p.file_id"
+        where, args = (" WHERE f.operator = ?", [operator]) if operator is not None else ("", [])
+        section_files = dict(self.conn.execute(
+            "SELECT s.name, COUNT(DISTINCT p.file_id)" + joins + where + " GROUP BY p.section_id", args))
+
+        required = {section: set() for section in section_files}
+        rows = self.conn.execute(
+            "SELECT s.name, pa.name, COUNT(DISTINCT p.file_id)" + joins
+            + " JOIN parameters pa ON pa.id = p.parameter_id" + where + " GROUP BY p.section_id, p.parameter_id", args)
+        for section, parameter, files in rows:
+            if files == section_files[section]:
+                required[section].add(parameter)
+        return required
+
+    def close(self):
+        self.conn.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find which operators, sections and files use a parameter.")
+    parser.add_argument("index_path", help="parameter_index.sqlite written by a template run")
+    parser.add_argument("parameter")
+    parser.add_argument("--section", help="Only report this section")
+    parser.add_argument("--operator", help="Only report this operator")
+    args = parser.parse_args(argv)
+
+    with ParameterIndex(args.index_path) as index:
+        rows = index.lookup(args.parameter, args.section, args.operator)
+
+    for operator, section, path in rows:
+        print(f"{operator}\t{section}\t{path}")
+    if not rows:
+        print(f"Parameter not found: {args.parameter}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
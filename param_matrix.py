@@ -0,0 +1,129 @@
+_popcount = getattr(int, "bit_count", None) or (lambda bits: bin(bits).count("1"))
+
+class ParameterMatrix:
+    """Per-CSV parameter sets stored as bitsets over one interned parameter vocabulary.
+
+    Each row is a Python int with one bit per vocabulary entry, so intersections, unions
+    and overlap counts run as big-int AND/OR/popcount instead of set operations.
+    """
+
+    def __init__(self, param_sets=None):
+        self.vocabulary = {}
+        self.parameters = []
+        self.names = []
+        self.rows = []
+        for name, params in (param_sets or {}).items():
+            self.add(name, params)
+
+    def add(self, name, params):
+        """Add one CSV's parameters as a new row."""
+        vocabulary = self.vocabulary
+        indices = []
+        for param in params:
+            index = vocabulary.get(param)
+            if index is None:
+                index = vocabulary[param] = len(self.parameters)
+                self.parameters.append(param)
+            indices.append(index)
+
+        packed = bytearray((len(self.parameters) + 7) // 8)
+        for index in indices:
+            packed[index >> 3] |= 1 << (index & 7)
+        self.names.append(name)
+        self.rows.append(int.from_bytes(packed, "little"))
+
+    def decode(self, bits):
+        """Return the parameter names set in a bitset."""
+        params = set()
+        while bits:
+            low = bits & -bits
+            params.add(self.parameters[low.bit_length() - 1])
+            bits ^= low
+        return params
+
+    def common_bits(self):
+        """Bitset of parameters present in every row."""
+        if not self.rows:
+            return 0
+        bits = self.rows[0]
+        for row in self.rows[1:]:
+            bits &= row
+        return bits
+
+    def union_bits(self):
+        """Bitset of parameters present in any row."""
+        bits = 0
+        for row in self.rows:
+            bits |= row
+        return bits
+
+    def common(self):
+        return self.decode(self.common_bits())
+
+    def union(self):
+        return self.decode(self.union_bits())
+
+    def counts(self):
+        """Number of parameters in each row, in row order."""
+        return [_popcount(row) for row in self.rows]
+
+    def overlap_matrix(self):
+        """Return the N x N matrix of pairwise shared-parameter counts.
+
+        Uses a single NumPy matrix multiply when NumPy is installed, otherwise popcounts
+        over the upper triangle of row pairs.
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            return self._overlap_matrix_popcount()
+
+        nbytes = (len(self.parameters) + 7) // 8
+        packed = b"".join(row.to_bytes(nbytes, "little") for row in self.rows)
+        packed = np.frombuffer(packed, dtype=np.uint8).reshape(len(self.rows), nbytes)
+        dense = np.unpackbits(packed, axis=1, bitorder="little").astype(np.float32)
+        return (dense @ dense.T).astype(np.int64)
+
+    def block_overlap_matrix(self, max_blocks):
+        """Return (labels, matrix) of mean shared-parameter counts between blocks of similar rows.
+
+        Rows are ordered by bitset, so identical and near-identical parameter sets sit next
+        to each other, then cut into at most max_blocks contiguous blocks. Block (i, j) is the
+        mean overlap over all row pairs across the two blocks, computed from per-block
+        parameter counts, so the full N x N matrix is never formed.
+        """
+        order = sorted(range(len(self.rows)), key=lambda index: self.rows[index])
+        size = -(-len(order) // max_blocks) if order else 1
+        blocks = [order[start:start + size] for start in range(0, len(order), size)]
+
+        block_counts = []
+        for block in blocks:
+            counts = {}
+            for index in block:
+                bits = self.rows[index]
+                while bits:
+                    low = bits & -bits
+                    bit = low.bit_length() - 1
+                    counts[bit] = counts.get(bit, 0) + 1
+                    bits ^= low
+            block_counts.append(counts)
+
+        matrix = [[0.0] * len(blocks) for _ in blocks]
+        for i, counts_i in enumerate(block_counts):
+            for j in range(i, len(blocks)):
+                counts_j = block_counts[j]
+                shared = sum(count * counts_j[bit] for bit, count in counts_i.items() if bit in counts_j)
+                matrix[i][j] = matrix[j][i] = shared / (len(blocks[i]) * len(blocks[j]))
+
+        labels = [self.names[block[0]] if len(block) == 1 else f"{self.names[block[0]]} (+{len(block) - 1})"
+                  for block in blocks]
+        return labels, matrix
+
+    def _overlap_matrix_popcount(self):
+        rows = self.rows
+        matrix = [[0] * len(rows) for _ in rows]
+        for i, row in enumerate(rows):
+            matrix[i][i] = _popcount(row)
+            for j in range(i + 1, len(rows)):
+                matrix[i][j] = matrix[j][i] = _popcount(row & rows[j])
+        return matrix
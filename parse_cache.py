@@ -0,0 +1,128 @@
+import os
+import pickle
+import sqlite3
+import hashlib
+import threading
+
+# Bump when the shape of cached parse results or the table layout changes; older entries are then discarded
+CACHE_VERSION = 3
+
+def file_digest(file_path, chunk_size=1 << 20):
+    """Return the BLAKE2b content hash of a file."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def data_digest(data):
+    """Return the file_digest of a file whose bytes are data."""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+class ParseCache:
+    """On-disk cache of per-file parse results, keyed by parser, path, size, mtime and content hash.
+
+    A file whose size and mtime are unchanged is served straight from the cache. If only
+    the mtime moved, the content hash decides whether the cached result is still valid.
+    parser identifies the code that produced the results, e.g. a pipeline's PARSE_CACHE_KEY;
+    pipelines sharing one database each only see their own entries.
+
+    lookup and fetch may be called from several threads, e.g. an io_pipeline's stages.
+    """
+
+    def __init__(self, cache_path, parser):
+        self.parser = parser
+        self.conn = sqlite3.connect(cache_path, timeout=60, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != CACHE_VERSION:
+            with self.conn:
+                self.conn.execute("DROP TABLE IF EXISTS entries")
+                self.conn.execute(f"PRAGMA user_version = {CACHE_VERSION}")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (parser TEXT, path TEXT, size INTEGER, mtime_ns INTEGER, "
+            "digest TEXT, result BLOB, PRIMARY KEY (parser, path))"
+        )
+        self.seen = set()
+        self.stats = {}  # path -> os.stat_result taken by lookup before the file was read
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _row(self, path):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT size, mtime_ns, digest, result FROM entries WHERE parser = ? AND path = ?", (self.parser, path)
+            ).fetchone()
+
+    def lookup(self, file_path):
+        """Return the cached result for a file whose size and mtime are unchanged, or None.
+
+        On a miss the file's stat is kept for the fetch that parses it, so the result is
+        stored under the file's state from before it was read.
+        """
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        row = self._row(path)
+        with self.lock:
+            self.seen.add(path)
+            if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+                return pickle.loads(row[3])
+            self.stats[path] = stat
+        return None
+
+    def fetch(self, file_path, parse_func, data=None):
+        """Return parse_func(file_path), reusing the cached result if the file is unchanged.
+
+        If the file's bytes were already read, pass them as data: they are hashed instead
+        of the file and parse_func(file_path, data) is called.
+        """
+        path = os.path.abspath(file_path)
+        with self.lock:
+            self.seen.add(path)
+            stat = self.stats.pop(path, None)
+        stat = stat or os.stat(path)
+
+        row = self._row(path)
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return pickle.loads(row[3])
+
+        digest = file_digest(path) if data is None else data_digest(data)
+        if row and row[0] == stat.st_size and row[2] == digest:
+            with self.lock, self.conn:
+                self.conn.execute("UPDATE entries SET mtime_ns = ? WHERE parser = ? AND path = ?",
+                                  (stat.st_mtime_ns, self.parser, path))
+            return pickle.loads(row[3])
+
+        result = parse_func(file_path) if data is None else parse_func(file_path, data)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (self.parser, path, stat.st_size, stat.st_mtime_ns, digest, pickle.dumps(result, pickle.HIGHEST_PROTOCOL)),
+            )
+        return result
+
+    def evict_unseen(self, root):
+        """Drop this parser's entries under root that were not fetched through this cache instance."""
+        prefix = os.path.join(os.path.abspath(root), "")
+        paths = [path for (path,) in self.conn.execute(
+            "SELECT path FROM entries WHERE parser = ? AND substr(path, 1, ?) = ?", (self.parser, len(prefix), prefix)
+        )]
+        stale = [(self.parser, path) for path in paths if path not in self.seen]
+        with self.conn:
+            self.conn.executemany("DELETE FROM entries WHERE parser = ? AND path = ?", stale)
+        return len(stale)
+
+    def evict_missing(self):
+        """Drop entries, of any parser, whose files no longer exist."""
+        stale = [(path,) for (path,) in self.conn.execute("SELECT DISTINCT path FROM entries") if not os.path.exists(path)]
+        with self.conn:
+            self.conn.executemany("DELETE FROM entries WHERE path = ?", stale)
+        return len(stale)
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,127 @@
+import os
+import html
+from concurrent.futures import ProcessPoolExecutor
+
+# Heatmaps larger than this are aggregated into blocks; cells are annotated only up to ANNOTATE_MAX
+HEATMAP_MAX = 60
+ANNOTATE_MAX = 20
+# Section types beyond the most frequent ones are summed into "other" in the distribution chart
+MAX_SECTION_SERIES = 20
+
+def _pyplot():
+    """Import pyplot on first use, with a non-interactive backend."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+def render_heatmap(figure_path, title, labels, matrix, annotate):
+    """Draw a square overlap matrix as a heatmap PNG."""
+    plt = _pyplot()
+    size = len(labels)
+    side = min(max(6, size * 0.25), 20)
+    fig, ax = plt.subplots(figsize=(side + 2, side))
+    image = ax.imshow(matrix, cmap="Blues")
+    fig.colorbar(image, ax=ax)
+    ax.set_xticks(range(size))
+    ax.set_yticks(range(size))
+    ax.set_xticklabels(labels, rotation=90, fontsize=8)
+    ax.set_yticklabels(labels, fontsize=8)
+    if annotate:
+        for i, row in enumerate(matrix):
+            for j, value in enumerate(row):
+                ax.text(j, i, f"{value:g}", ha="center", va="center", fontsize=7)
+    ax.set_title(title)
+    ax.set_xlabel("CSV Files")
+    ax.set_ylabel("CSV Files")
+    fig.savefig(figure_path, bbox_inches="tight")
+    plt.close(fig)
+    return figure_path
+
+def render_stacked_bars(figure_path, title, categories, series):
+    """Draw {series name: [value per category]} as a stacked bar chart PNG."""
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(max(10, len(categories) * 0.4), 6))
+    colors = plt.get_cmap("viridis")
+    bottoms = [0] * len(categories)
+    for index, (name, values) in enumerate(series.items()):
+        ax.bar(categories, values, bottom=bottoms, label=name, color=colors(index / max(len(series) - 1, 1)))
+        bottoms = [bottom + value for bottom, value in zip(bottoms, values)]
+    ax.set_title(title)
+    ax.set_xlabel("Operators")
+    ax.set_ylabel("Section Count")
+    ax.tick_params(axis="x", rotation=90)
+    ax.legend(title="Section Type", bbox_to_anchor=(1, 1))
+    fig.savefig(figure_path, bbox_inches="tight")
+    plt.close(fig)
+    return figure_path
+
+class FigureRenderer:
+    """Render report figures in one background process while the caller keeps working.
+
+    Large inputs are reduced before they are sent to the renderer: heatmaps are aggregated
+    into at most heatmap_max blocks of similar CSVs and lose their cell annotations, and the
+    section distribution keeps only the most frequent section types, so rendering time is
+    bounded whatever the number of files. close() waits for all figures and writes an
+    index.html linking them.
+    """
+
+    def __init__(self, figure_dir, heatmap_max=HEATMAP_MAX):
+        self.figure_dir = figure_dir
+        self.heatmap_max = heatmap_max
+        self.executor = ProcessPoolExecutor(max_workers=1)
+        self.figures = []
+        os.makedirs(figure_dir, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _submit(self, title, file_name, render, *args):
+        figure_path = os.path.join(self.figure_dir, file_name)
+        self.figures.append((title, file_name, self.executor.submit(render, figure_path, title, *args)))
+
+    def parameter_heatmap(self, operator, matrix):
+        """Queue the CSV parameter-overlap heatmap of one operator's ParameterMatrix."""
+        if len(matrix.names) > self.heatmap_max:
+            labels, overlap = matrix.block_overlap_matrix(self.heatmap_max)
+        else:
+            labels = list(matrix.names)
+            overlap = [[int(value) for value in row] for row in matrix.overlap_matrix()]
+        self._submit(f"Parameter Similarity Heatmap - {operator}", f"parameter_heatmap_{operator}.png",
+                     render_heatmap, labels, overlap, len(labels) <= ANNOTATE_MAX)
+
+    def section_distribution(self, operator_section_counts):
+        """Queue a stacked bar chart of section types per operator."""
+        operators = list(operator_section_counts)
+        totals = {}
+        for counts in operator_section_counts.values():
+            for section, count in counts.items():
+                totals[section] = totals.get(section, 0) + count
+        top = sorted(totals, key=lambda section: (-totals[section], section))[:MAX_SECTION_SERIES]
+
+        series = {section: [operator_section_counts[operator].get(section, 0) for operator in operators]
+                  for section in top}
+        if len(totals) > len(top):
+            series["other"] = [sum(count for section, count in operator_section_counts[operator].items()
+                                   if section not in series) for operator in operators]
+        self._submit("Section Type Distribution Across Operators", "section_distribution.png",
+                     render_stacked_bars, operators, series)
+
+    def close(self):
+        """Wait for every queued figure, report where it was saved and write index.html."""
+        try:
+            for title, file_name, future in self.figures:
+                print(f"Figure saved: {future.result()}")
+        finally:
+            self.executor.shutdown()
+
+        index_path = os.path.join(self.figure_dir, "index.html")
+        with open(index_path, "w", encoding="utf-8") as f:
+            f.write("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Template Report</title></head><body>\n")
+            for title, file_name, _ in self.figures:
+                f.write(f"<h2>{html.escape(title)}</h2>\n<img src=\"{html.escape(file_name)}\" alt=\"{html.escape(title)}\">\n")
+            f.write("</body></html>\n")
+        print(f"Report index saved: {index_path}")
@@ -0,0 +1,156 @@
+import os
+import sys
+import json
+import time
+import resource
+import threading
+import contextlib
+
+def peak_rss_mb():
+    """Peak RSS of this process or any finished child process, in MB."""
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) / scale
+
+class RunStats:
+    """Per-stage timings, per-file parse metrics, counters and peak memory for one run.
+
+    Stage CPU time is the calling thread's CPU time, so stages timed in pipeline threads
+    are not charged for work done concurrently elsewhere. Stats collected in worker
+    processes are pickled back and folded in with merge().
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.files = []
+        self.counters = {}
+        self.peak_rss_mb = 0.0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        self.peak_rss_mb = max(self.peak_rss_mb, peak_rss_mb())
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time a block as part of a named stage."""
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            with self._lock:
+                stage = self.stages.setdefault(name, {"wall_seconds": 0.0, "cpu_seconds": 0.0, "calls": 0})
+                stage["wall_seconds"] += wall
+                stage["cpu_seconds"] += cpu
+                stage["calls"] += 1
+
+    def timed_iter(self, name, iterable):
+        """Yield from iterable, charging the time spent producing each item to a stage."""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_file(self, operator, path, size, sections, parameters, seconds):
+        with self._lock:
+            self.files.append({"operator": operator, "path": path, "bytes": size, "sections": sections,
+                               "parameters": parameters, "parse_seconds": seconds})
+
+    def merge(self, other):
+        """Fold stats from another RunStats, e.g. one returned by a worker process."""
+        with self._lock:
+            for name, other_stage in other.stages.items():
+                stage = self.stages.setdefault(name, {"wall_seconds": 0.0, "cpu_seconds": 0.0, "calls": 0})
+                for key, value in other_stage.items():
+                    stage[key] += value
+            for name, value in other.counters.items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            self.files.extend(other.files)
+            self.peak_rss_mb = max(self.peak_rss_mb, other.peak_rss_mb)
+
+    def slowest(self, n=10):
+        return sorted(self.files, key=lambda record: record["parse_seconds"], reverse=True)[:n]
+
+    def report(self, slowest=10):
+        """Return the run report as a JSON-serializable dict."""
+        self.peak_rss_mb = max(self.peak_rss_mb, peak_rss_mb())
+        return {
+            "stages": self.stages,
+            "counters": self.counters,
+            "peak_rss_mb": self.peak_rss_mb,
+            "totals": {"files": len(self.files), "bytes": sum(record["bytes"] for record in self.files)},
+            "slowest_files": self.slowest(slowest),
+            "files": self.files,
+        }
+
+    def write_json(self, file_path, slowest=10):
+        _write_atomic(file_path, json.dumps(self.report(slowest), indent=2))
+        print(f"Run report saved: {file_path}")
+
+    def write_prometheus(self, file_path, slowest=10):
+        """Write a Prometheus textfile-collector file; per-file series only for the slowest files."""
+        report = self.report(slowest)
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        metric("master_template_stage_wall_seconds", "gauge", "Wall time spent in each pipeline stage.",
+               [({"stage": name}, stage["wall_seconds"]) for name, stage in report["stages"].items()])
+        metric("master_template_stage_cpu_seconds", "gauge", "CPU time spent in each pipeline stage.",
+               [({"stage": name}, stage["cpu_seconds"]) for name, stage in report["stages"].items()])
+        metric("master_template_stage_calls", "gauge", "Number of timed calls per pipeline stage.",
+               [({"stage": name}, stage["calls"]) for name, stage in report["stages"].items()])
+        metric("master_template_files", "gauge", "Files parsed in the run.", [({}, report["totals"]["files"])])
+        metric("master_template_bytes", "gauge", "Bytes parsed in the run.", [({}, report["totals"]["bytes"])])
+        metric("master_template_peak_rss_bytes", "gauge", "Peak resident memory of the run.",
+               [({}, int(report["peak_rss_mb"] * 1024 * 1024))])
+        metric("master_template_counter", "gauge", "Run counters such as cache hits.",
+               [({"name": name}, value) for name, value in report["counters"].items()])
+        metric("master_template_slowest_file_parse_seconds", "gauge", "Parse time of the slowest files.",
+               [({"operator": record["operator"], "path": record["path"]}, record["parse_seconds"])
+                for record in report["slowest_files"]])
+
+        _write_atomic(file_path, "\n".join(lines) + "\n")
+        print(f"Prometheus metrics saved: {file_path}")
+
+    def print_summary(self, slowest=10):
+        print("\n### Run Stages ###")
+        for name, stage in sorted(self.stages.items(), key=lambda item: item[1]["wall_seconds"], reverse=True):
+            print(f"{name}: {stage['wall_seconds']:.3f}s wall, {stage['cpu_seconds']:.3f}s cpu, {stage['calls']} calls")
+        print(f"\n### Slowest {slowest} Files ###")
+        for record in self.slowest(slowest):
+            print(f"{record['parse_seconds']:.3f}s  {record['operator']}/{record['path']} ({record['bytes']} bytes)")
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _write_atomic(file_path, text):
+    """Write via a temporary file and rename, so readers never see a partial file."""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, file_path)
@@ -0,0 +1,82 @@
+import os
+import re
+import json
+import zlib
+
+SHARD_VERSION = 1
+_SHARD_FILE = re.compile(r"shard_(\d+)_of_(\d+)\.json$")
+
+def shard_of(key, shard_count):
+    """Shard number of an operator or operator file; crc32 keeps it the same on every node."""
+    return zlib.crc32(key.encode("utf-8")) % shard_count
+
+def shard_path(output_dir, shard_index, shard_count):
+    return os.path.join(output_dir, f"shard_{shard_index}_of_{shard_count}.json")
+
+def assign_files(operator, operator_dir, file_paths, shard_index, shard_count, split_files=None):
+    """Return the (walk index, file path) pairs of an operator that belong to a shard, or None.
+
+    Operators with more than split_files files are partitioned file by file, so every shard
+    gets part of them; smaller operators go whole to a single shard. Walk indexes refer to
+    the operator's full walk, so merged records can be put back in single-node order.
+    """
+    if split_files and len(file_paths) > split_files:
+        return [(walk_index, file_path) for walk_index, file_path in enumerate(file_paths)
+                if shard_of(f"{operator}/{os.path.relpath(file_path, operator_dir)}", shard_count) == shard_index]
+    if shard_of(operator, shard_count) == shard_index:
+        return list(enumerate(file_paths))
+    return None
+
+def encode_entries(entries):
+    """Convert _load_csvs entries to JSON-friendly lists, keeping section and parameter order."""
+    return [[member_path, [[section, list(params)] for section, params in section_params.items()]]
+            for member_path, section_params in entries]
+
+def decode_entries(entries, make_params):
+    """Inverse of encode_entries; make_params rebuilds a pipeline's parameter container."""
+    return [(member_path, {section: make_params(params) for section, params in sections})
+            for member_path, sections in entries]
+
+def save_shard(file_path, shard_index, shard_count, operator_records):
+    """Save {operator: [[walk index, relative path, encoded entries], ...]} for one shard."""
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump({"version": SHARD_VERSION, "shard_index": shard_index, "shard_count": shard_count,
+                   "operators": operator_records}, f)
+    print(f"Shard saved: {file_path}")
+
+def load_shards(shard_dir):
+    """Combine every shard file in shard_dir into {operator: records in walk order}.
+
+    Shards must come from the same shard count and each index may appear only once;
+    missing shards are reported, and their operators or files are absent from the result.
+    """
+    shard_files = sorted(name for name in os.listdir(shard_dir) if _SHARD_FILE.match(name))
+    if not shard_files:
+        raise ValueError(f"No shard files found in {shard_dir}")
+
+    operator_records = {}
+    seen = set()
+    shard_count = None
+    for name in shard_files:
+        with open(os.path.join(shard_dir, name), encoding="utf-8") as f:
+            shard = json.load(f)
+        if shard.get("version") != SHARD_VERSION:
+            raise ValueError(f"Unsupported shard version in {name}: {shard.get('version')}")
+        if shard_count is not None and shard["shard_count"] != shard_count:
+            raise ValueError(f"{name} is one of {shard['shard_count']} shards, expected {shard_count}")
+        if shard["shard_index"] in seen:
+            raise ValueError(f"Shard {shard['shard_index']} given more than once")
+        shard_count = shard["shard_count"]
+        seen.add(shard["shard_index"])
+
+        for operator, records in shard["operators"].items():
+            operator_records.setdefault(operator, []).extend(records)
+
+    missing = sorted(set(range(shard_count)) - seen)
+    if missing:
+        print(f"Warning: missing shards {missing} of {shard_count}; their files are not in the merged templates")
+
+    for records in operator_records.values():
+        records.sort(key=lambda record: record[0])
+    return operator_records
@@ -0,0 +1,129 @@
+import os
+import json
+
+ARTIFACT_VERSION = 1
+INDEX_VERSION = 2
+GLOBAL_INDEX_FILE = "global_master_index.json"
+
+def artifact_path(operator, output_dir):
+    return os.path.join(output_dir, f"template_{operator}.json")
+
+def save_operator_artifact(operator, template, output_dir):
+    """Save an operator template as a versioned JSON artifact, keeping section and parameter order."""
+    os.makedirs(output_dir, exist_ok=True)
+    file_path = artifact_path(operator, output_dir)
+    artifact = {
+        "version": ARTIFACT_VERSION,
+        "operator": operator,
+        "sections": [[section, list(params)] for section, params in template.items()],
+    }
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(artifact, f)
+    return file_path
+
+def load_operator_artifact(file_path):
+    """Load an operator artifact as (operator, {section: [parameters]})."""
+    with open(file_path, encoding="utf-8") as f:
+        artifact = json.load(f)
+    if artifact.get("version") != ARTIFACT_VERSION:
+        raise ValueError(f"Unsupported template artifact version in {file_path}: {artifact.get('version')}")
+    return artifact["operator"], {section: params for section, params in artifact["sections"]}
+
+class GlobalMaster:
+    """Global master template that can be updated one operator at a time.
+
+    For every section and parameter the index records which operators contribute it and
+    at which position in their template. The global order is the one a full rebuild over
+    operators in sorted order produces: an entry sorts by its first (operator, position).
+    Replacing an operator only touches that operator's sections, and only those sections
+    are re-ordered when the template is next read. Sections without parameters are left
+    out unless keep_empty_sections is set.
+    """
+
+    def __init__(self, sort_parameters=False, keep_empty_sections=False):
+        self.sort_parameters = sort_parameters
+        self.keep_empty_sections = keep_empty_sections
+        self.sections = {}
+        self.operator_sections = {}
+        self._ordered = {}
+        self._dirty = set()
+
+    def update_operator(self, operator, template):
+        """Replace an operator's contribution with a new {section: [parameters]} template."""
+        self.remove_operator(operator)
+        self.operator_sections[operator] = []
+
+        for section_index, (section, params) in enumerate(template.items()):
+            if not params and not self.keep_empty_sections:
+                continue
+
+            self.operator_sections[operator].append(section)
+            entry = self.sections.setdefault(section, {"owners": {}, "params": {}})
+            entry["owners"][operator] = section_index
+            for param_index, param in enumerate(params):
+                entry["params"].setdefault(param, {})[operator] = param_index
+            self._dirty.add(section)
+
+    def remove_operator(self, operator):
+        """Drop an operator's contribution, if it has one."""
+        for section in self.operator_sections.pop(operator, []):
+            entry = self.sections[section]
+            del entry["owners"][operator]
+            if not entry["owners"]:
+                del self.sections[section]
+                self._ordered.pop(section, None)
+                self._dirty.discard(section)
+                continue
+
+            for param in [param for param, owners in entry["params"].items() if operator in owners]:
+                owners = entry["params"][param]
+                del owners[operator]
+                if not owners:
+                    del entry["params"][param]
+            self._dirty.add(section)
+
+    def template(self):
+        """Return the global {section: [parameters]} template."""
+        for section in self._dirty:
+            params = self.sections[section]["params"]
+            if self.sort_parameters:
+                self._ordered[section] = sorted(params)
+            else:
+                self._ordered[section] = sorted(params, key=lambda param: min(params[param].items()))
+        self._dirty.clear()
+
+        ordered_sections = sorted(self.sections, key=lambda section: min(self.sections[section]["owners"].items()))
+        return {section: list(self._ordered[section]) for section in ordered_sections}
+
+    def save(self, file_path):
+        """Save the index, including the current per-section parameter order.
+
+        Sections are saved as [name, ...] pairs rather than object keys, so the None section
+        of rows before the first header is not turned into the string "null". They are
+        written in template order, so equal templates give byte-identical files.
+        """
+        ordered = self.template()
+        index = {"version": INDEX_VERSION, "sort_parameters": self.sort_parameters,
+                 "keep_empty_sections": self.keep_empty_sections,
+                 "sections": [(section, self.sections[section]) for section in ordered],
+                 "operator_sections": self.operator_sections, "ordered": list(ordered.items())}
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(index))  # One C-encoder call; json.dump encodes chunk by chunk in Python
+
+    @classmethod
+    def load(cls, file_path, sort_parameters=False, keep_empty_sections=False):
+        """Load a saved index, or start an empty one if file_path does not exist."""
+        master = cls(sort_parameters, keep_empty_sections)
+        if not os.path.exists(file_path):
+            return master
+
+        with open(file_path, encoding="utf-8") as f:
+            index = json.load(f)
+        if (index.get("version") != INDEX_VERSION or index.get("sort_parameters") != sort_parameters
+                or index.get("keep_empty_sections") != keep_empty_sections):
+            raise ValueError(f"Incompatible global master index: {file_path}")
+
+        master.sections = dict(index["sections"])
+        master.operator_sections = index["operator_sections"]
+        master._ordered = dict(index["ordered"])
+        return master
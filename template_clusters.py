@@ -0,0 +1,112 @@
+import json
+import random
+import hashlib
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+def _stable_hash(value):
+    """64-bit hash of a string that is the same in every process, unlike hash()."""
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little")
+
+def jaccard(a, b):
+    union = len(a | b)
+    return len(a & b) / union if union else 1.0
+
+class TemplateClusters:
+    """Group CSVs whose parameter sets are near-duplicates, using MinHash signatures and LSH banding.
+
+    CSVs with identical parameter sets are collapsed first, so the signature work scales
+    with the number of distinct templates. Each distinct set gets a num_perm MinHash
+    signature, split into `bands` bands; sets sharing any band become candidates and are
+    joined when their exact Jaccard similarity is at least threshold. Raising threshold
+    gives tighter clusters; more bands (fewer rows per band) find more candidate pairs,
+    at roughly (1 / bands) ** (1 / rows) similarity, at the cost of more comparisons.
+    """
+
+    def __init__(self, num_perm=64, bands=16, threshold=0.8, seed=1):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        rng = random.Random(seed)
+        self.coefficients = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(_MERSENNE_PRIME))
+                             for _ in range(num_perm)]
+        self._param_hashes = {}
+        self.sets = {}
+
+    def add(self, name, params):
+        """Add one CSV's parameter set."""
+        self.sets.setdefault(frozenset(params), []).append(name)
+
+    def _param_hashes_for(self, param):
+        hashes = self._param_hashes.get(param)
+        if hashes is None:
+            x = _stable_hash(param)
+            hashes = self._param_hashes[param] = [(a * x + b) % _MERSENNE_PRIME for a, b in self.coefficients]
+        return hashes
+
+    def signature(self, params):
+        """MinHash signature of a non-empty parameter set."""
+        return list(map(min, zip(*map(self._param_hashes_for, params))))
+
+    def clusters(self):
+        """Return clusters as dicts, largest first, each with a representative CSV and its parameters.
+
+        The representative is the cluster's most common parameter set; min_similarity is
+        the lowest Jaccard similarity of any member set to it.
+        """
+        distinct = list(self.sets)
+        parent = list(range(len(distinct)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        buckets = [{} for _ in range(self.bands)]
+        for i, params in enumerate(distinct):
+            if not params:
+                continue
+            signature = self.signature(params)
+            for band, band_buckets in enumerate(buckets):
+                key = tuple(signature[band * self.rows:(band + 1) * self.rows])
+                first = band_buckets.setdefault(key, i)
+                if first == i:
+                    continue
+                root_first, root_i = find(first), find(i)
+                if root_first != root_i and jaccard(distinct[first], params) >= self.threshold:
+                    parent[root_i] = root_first
+
+        groups = {}
+        for i in range(len(distinct)):
+            groups.setdefault(find(i), []).append(i)
+
+        clusters = []
+        for members in groups.values():
+            representative = max(members, key=lambda i: len(self.sets[distinct[i]]))
+            rep_params = distinct[representative]
+            clusters.append({
+                "representative": self.sets[rep_params][0],
+                "parameters": sorted(rep_params),
+                "files": sum(len(self.sets[distinct[i]]) for i in members),
+                "templates": len(members),
+                "min_similarity": min(jaccard(distinct[i], rep_params) for i in members),
+                "members": [name for i in members for name in self.sets[distinct[i]]],
+            })
+        clusters.sort(key=lambda cluster: (-cluster["files"], cluster["representative"]))
+        return clusters
+
+def find_template_clusters(operator_param_sets, num_perm=64, bands=16, threshold=0.8):
+    """Cluster every operator's CSVs by parameter set; members are named "<operator>/<csv>"."""
+    clusters = TemplateClusters(num_perm, bands, threshold)
+    for operator, csv_param_sets in operator_param_sets.items():
+        for name, params in csv_param_sets.items():
+            clusters.add(f"{operator}/{name}", params)
+    return clusters.clusters()
+
+def save_clusters(clusters, file_path):
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump({"clusters": clusters}, f, indent=2)
+    print(f"Template clusters saved: {file_path} ({len(clusters)} clusters)")
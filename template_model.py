@@ -0,0 +1,162 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set
+
+class ParameterTable:
+    """Interns parameter names to dense integer ids shared by every set of one template."""
+
+    __slots__ = ("ids", "names")
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def id(self, name: str) -> int:
+        param_id = self.ids.get(name)
+        if param_id is None:
+            param_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return param_id
+
+    def lookup(self, names: Iterable[str]) -> List[int]:
+        """Return the ids of names, adding the new ones."""
+        if not isinstance(names, (list, tuple)):
+            names = list(names)
+        get = self.ids.get
+        param_ids = [get(name) for name in names]
+        if None in param_ids:
+            param_ids = [self.id(name) if param_id is None else param_id for name, param_id in zip(names, param_ids)]
+        return param_ids
+
+class ParamSet:
+    """Set of parameter ids kept in first-seen order in an unsigned int array.
+
+    Iterating, len() and `in` work on parameter names, so a ParamSet can stand in for a
+    set of names. Membership while adding uses a set of ids, built only once the set is
+    added to, so sets that are never extended, like per-CSV sets, stay a bare array.
+    """
+
+    __slots__ = ("table", "ids", "_members")
+
+    def __init__(self, table: ParameterTable, ids: Iterable[int] = ()):
+        """Start from ids of table that are already unique; add others with update or add_ids."""
+        self.table = table
+        self.ids = array("I", ids)
+        self._members: Optional[Set[int]] = None
+
+    def add_ids(self, param_ids: List[int]) -> None:
+        """Add ids of this set's table, keeping first-seen order."""
+        members = self._members
+        if members is None:
+            members = self._members = set(self.ids)
+        if members.issuperset(param_ids):
+            return  # The common case: a CSV repeating parameters already in the section
+        append = self.ids.append
+        for param_id in param_ids:
+            if param_id not in members:
+                members.add(param_id)
+                append(param_id)
+
+    def update(self, names: Iterable[str]) -> None:
+        self.add_ids(self.table.lookup(names))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[str]:
+        return map(self.table.names.__getitem__, self.ids)
+
+    def __contains__(self, name: str) -> bool:
+        param_id = self.table.ids.get(name)
+        return param_id is not None and param_id in self.ids
+
+    def names(self) -> List[str]:
+        """Parameter names in first-seen order."""
+        return list(self)
+
+class Section:
+    """One template section and the parameters seen in it."""
+
+    __slots__ = ("name", "parameters")
+
+    def __init__(self, name: str, table: ParameterTable):
+        self.name = name
+        self.parameters = ParamSet(table)
+
+class FileTemplate:
+    """One CSV of an operator: its first section and the union of its parameters."""
+
+    __slots__ = ("name", "first_section", "parameters")
+
+    def __init__(self, name: str, first_section: str, parameters: ParamSet):
+        self.name = name
+        self.first_section = first_section
+        self.parameters = parameters
+
+class OperatorTemplate:
+    """Sections, per-CSV parameter sets and first-section counts of one operator.
+
+    Every parameter is stored once in the operator's ParameterTable; sections and CSVs
+    hold array-backed ParamSets of ids. Sections keep first-seen order, and their
+    parameters first-seen order unless template() is asked to sort them.
+    """
+
+    __slots__ = ("name", "table", "sections", "files", "section_counts")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.table = ParameterTable()
+        self.sections: Dict[str, Section] = {}
+        self.files: List[FileTemplate] = []
+        self.section_counts: Dict[str, int] = {}
+
+    def section(self, name: str) -> Section:
+        """Return a section, adding it if it is new."""
+        section = self.sections.get(name)
+        if section is None:
+            section = self.sections[name] = Section(name, self.table)
+        return section
+
+    def merge_sections(self, section_params: Mapping[str, Iterable[str]]) -> None:
+        """Union {section: parameter names} into the template's sections."""
+        for name, params in section_params.items():
+            self.section(name).parameters.update(params)
+
+    def add_file(self, name: str, section_params: Mapping[str, Iterable[str]]) -> Optional[FileTemplate]:
+        """Fold one parsed CSV's {section: parameter names} into the template.
+
+        CSVs without sections are ignored and return None.
+        """
+        if not section_params:
+            return None
+
+        first_section = next(iter(section_params))
+        self.section_counts[first_section] = self.section_counts.get(first_section, 0) + 1
+
+        lookup = self.table.lookup
+        file_ids = set()
+        for section_name, params in section_params.items():
+            param_ids = lookup(params)
+            self.section(section_name).parameters.add_ids(param_ids)
+            file_ids.update(param_ids)
+
+        file_template = FileTemplate(name, first_section, ParamSet(self.table, sorted(file_ids)))
+        self.files.append(file_template)
+        return file_template
+
+    def merge(self, other: "OperatorTemplate") -> None:
+        """Union another template's sections into this one, e.g. to build a global master."""
+        for name, section in other.sections.items():
+            self.section(name).parameters.update(section.parameters)
+
+    def template(self, sort_parameters: bool = False) -> Dict[str, List[str]]:
+        """Return the {section: [parameters]} master template."""
+        if sort_parameters:
+            return {name: sorted(section.parameters) for name, section in self.sections.items()}
+        return {name: section.parameters.names() for name, section in self.sections.items()}
+
+    def param_sets(self) -> Dict[str, ParamSet]:
+        """Return {CSV name: parameters} for every CSV with at least one section."""
+        return {file_template.name: file_template.parameters for file_template in self.files}
@@ -0,0 +1,685 @@
+import os
+import io
+import zipfile
+import argparse
+import contextlib
+import functools
+import time
+from typing import Dict, List, Mapping, Optional
+from concurrent.futures import ProcessPoolExecutor
+from parse_cache import ParseCache
+from param_matrix import ParameterMatrix
+from value_profile import ValueProfile
+from template_artifacts import GLOBAL_INDEX_FILE, GlobalMaster, artifact_path, save_operator_artifact
+from param_index import BATCH_FILES, ParameterIndex
+from io_pipeline import MAX_BYTES, QUEUE_SIZE, run_pipeline
+from run_report import RunStats
+from watch import TemplateWatcher
+from report_figures import HEATMAP_MAX, FigureRenderer
+from shards import assign_files, decode_entries, encode_entries, load_shards, save_shard, shard_path
+from template_model import OperatorTemplate
+from validate import TemplateValidator, load_master_template, template_operator, validate_files
+from template_clusters import find_template_clusters, save_clusters
+
+PARAMETER_INDEX_FILE = "parameter_index.sqlite"
+VALIDATION_REPORT_FILE = "validation_report.jsonl"
+
+def iter_zip_csvs(zip_source, prefix=""):
+    """Yield (member path, text stream) for each CSV in a ZIP, descending into nested ZIPs."""
+    with zipfile.ZipFile(zip_source, 'r') as zip_ref:
+        for member in zip_ref.infolist():
+            if member.is_dir():
+                continue
+
+            member_path = prefix + member.filename
+            if member.filename.endswith(".zip"):
+                nested = io.BytesIO(zip_ref.read(member))
+                yield from iter_zip_csvs(nested, member_path + "/")
+            elif member.filename.endswith(".csv"):
+                with zip_ref.open(member) as raw:
+                    yield member_path, io.TextIOWrapper(raw, encoding='utf-8')
+
+def open_text(source):
+    """Open a CSV path for reading; already-open text streams are passed through."""
+    if hasattr(source, "read"):
+        return contextlib.nullcontext(source)
+    return open(source, 'r', encoding='utf-8')
+
+def section_parameters(sections):
+    """Reduce parse_csv output to the {section: parameters} mapping templates are built from."""
+    return {sec: data["parameters"] for sec, data in sections.items()}
+
+class TemplatePipeline:
+    """Build, refresh, shard, watch and validate master templates around one script's CSV parser.
+
+    Mastertemplate and Updatedmaster each create one of these with their own parser and
+    sort policy, and run its main:
+
+    - parse_cache_key names the script's results in a shared --cache database.
+    - load_csvs(file_path, data=None) parses a CSV or ZIP into (member path, section
+      parameters) pairs; with large_files it also takes large_file_size and chunk_workers.
+    - parse_csv(file_path) parses one CSV with its values, for value profiles.
+    - merge_templates(operator_template) turns an OperatorTemplate into a master template.
+    - sort_parameters and keep_empty_sections configure the GlobalMaster. Sorted pipelines
+      keep parameters as sets; unsorted ones keep them in first-seen order.
+    - operator_details prints per-CSV parameter counts and queues a parameter heatmap for
+      each operator in the analysis.
+
+    Instances only hold module-level functions, so they can be pickled to worker processes.
+    """
+
+    def __init__(self, parse_cache_key, load_csvs, parse_csv, merge_templates, sort_parameters,
+                 keep_empty_sections=True, large_files=False, operator_details=False):
+        self.parse_cache_key = parse_cache_key
+        self.load_csvs = load_csvs
+        self.parse_csv = parse_csv
+        self.merge_templates = merge_templates
+        self.sort_parameters = sort_parameters
+        self.keep_empty_sections = keep_empty_sections
+        self.large_files = large_files
+        self.operator_details = operator_details
+
+    def global_master(self, index_path=None):
+        """Return an empty GlobalMaster for this pipeline, or the one saved at index_path."""
+        if index_path:
+            return GlobalMaster.load(index_path, self.sort_parameters, self.keep_empty_sections)
+        return GlobalMaster(self.sort_parameters, self.keep_empty_sections)
+
+    def _load(self, file_path, data=None, large_file_size=None, chunk_workers=None):
+        """Call load_csvs, passing the large-file options only to pipelines that take them."""
+        if self.large_files:
+            return self.load_csvs(file_path, data, large_file_size, chunk_workers)
+        return self.load_csvs(file_path, data)
+
+    @staticmethod
+    def iter_operator_files(operator_dir):
+        """Yield the CSV and ZIP files under an operator directory in sorted walk order."""
+        for root, dirs, files in os.walk(operator_dir):
+            dirs.sort()
+            for file in sorted(files):
+                if file.endswith((".zip", ".csv")):
+                    yield os.path.join(root, file)
+
+    @staticmethod
+    def fold_operator_files(operator_dir, loaded, index=None, stats=None, file_stamps=None):
+        """Fold (file path, parsed entries) pairs in walk order into the operator's OperatorTemplate.
+
+        With index set, each CSV's parameters are also recorded in that ParameterIndex, in
+        transactions of BATCH_FILES CSVs. file_stamps maps file paths to their (size, mtime_ns)
+        taken before they were read; with it, files whose CSVs the index holds with the same
+        stamp are not rewritten, and indexed CSVs that were not folded are removed.
+        """
+        operator = os.path.basename(os.path.normpath(operator_dir))
+        operator_template = OperatorTemplate(operator)
+        stats = stats or RunStats()
+        indexed = index.stamps(operator) if index and file_stamps is not None else {}
+        pending = []
+        stamps = {}
+
+        for file_path, entries in loaded:
+            stats.count("files_seen")
+            rel_path = os.path.relpath(file_path, operator_dir).replace(os.sep, "/")
+            names = [f"{rel_path}/{member_path}" if member_path else rel_path for member_path, _ in entries]
+            for name, (_, section_params) in zip(names, entries):
+                with stats.stage("merge"):
+                    operator_template.add_file(name, section_params)
+            if not index:
+                continue
+
+            if file_stamps is not None:
+                stamp = file_stamps.pop(file_path)
+                if [indexed.pop(name, None) for name in names] == [stamp] * len(names):
+                    continue  # Already indexed from this version of the file
+                stamps.update(dict.fromkeys(names, stamp))
+            pending.extend((name, section_params) for name, (_, section_params) in zip(names, entries))
+            if len(pending) >= BATCH_FILES:
+                with stats.stage("index"):
+                    index.add_files(operator, pending, stamps)
+                pending = []
+                stamps = {}
+
+        if index and (pending or indexed):
+            with stats.stage("index"):
+                index.add_files(operator, pending, stamps)
+                index.remove_files(operator, indexed)
+        return operator_template
+
+    def process_operator(self, operator_dir, cache_path=None, index_path=None, readers=0, parsers=1, stats=None,
+                         large_file_size=None, chunk_workers=None, max_bytes=MAX_BYTES, queue_size=QUEUE_SIZE):
+        """Process all CSVs for a given operator, reading ZIP members in place.
+
+        CSVs are keyed by their path relative to operator_dir; ZIP members by the ZIP's
+        relative path followed by the member path. With cache_path set, parse results are
+        reused from a ParseCache for unchanged files and entries for files that have
+        disappeared from operator_dir are evicted. With index_path set, the operator's
+        postings in that ParameterIndex are brought up to date with this run's, rewriting
+        only files whose size or mtime changed since they were indexed.
+
+        With readers > 0, directory scanning, file reads and parsing overlap in a threaded
+        io_pipeline with `readers` reader and `parsers` parser threads, holding at most
+        max_bytes of file data and queue_size files per queue; results are still folded in
+        walk order. Cache hits are served before their files are read.
+
+        With large_files pipelines, CSVs of at least large_file_size bytes are split at '@'
+        sections and parsed by chunk_workers processes; the pipelined mode does not read them.
+
+        Returns the operator's OperatorTemplate. Stage timings and per-file parse metrics are
+        recorded in stats, a RunStats, if given.
+        """
+        cache = ParseCache(cache_path, self.parse_cache_key) if cache_path else None
+        index = ParameterIndex(index_path) if index_path else None
+        operator = os.path.basename(os.path.normpath(operator_dir))
+        stats = stats or RunStats()
+
+        def load(file_path, data=None):
+            start = time.perf_counter()
+            with stats.stage("zip" if file_path.endswith(".zip") else "parse"):
+                entries = self._load(file_path, data, large_file_size, chunk_workers)
+            seconds = time.perf_counter() - start
+
+            rel_path = os.path.relpath(file_path, operator_dir).replace(os.sep, "/")
+            size = os.path.getsize(file_path) if data is None else len(data)
+            sections = sum(len(section_params) for _, section_params in entries)
+            parameters = sum(len(params) for _, section_params in entries for params in section_params.values())
+            stats.record_file(operator, rel_path, size, sections, parameters, seconds)
+            stats.count("files_parsed")
+            return entries
+
+        file_stamps = {}
+
+        def walk():
+            for file_path in self.iter_operator_files(operator_dir):
+                stat = os.stat(file_path)
+                file_stamps[file_path] = (stat.st_size, stat.st_mtime_ns)
+                yield file_path
+
+        file_paths = stats.timed_iter("walk", walk() if index else self.iter_operator_files(operator_dir))
+        if readers > 0:
+            parse = (lambda file_path, data: cache.fetch(file_path, load, data)) if cache else load
+            loaded = run_pipeline(file_paths, parse, readers, parsers, queue_size, max_bytes,
+                                  cache.lookup if cache else None, large_file_size)
+        elif cache:
+            loaded = ((file_path, cache.fetch(file_path, load)) for file_path in file_paths)
+        else:
+            loaded = ((file_path, load(file_path)) for file_path in file_paths)
+
+        operator_template = self.fold_operator_files(operator_dir, loaded, index, stats, file_stamps)
+
+        if cache:
+            cache.evict_unseen(operator_dir)
+            cache.close()
+        if index:
+            index.close()
+
+        return operator_template
+
+    def profile_operator_values(self, operator_dir, top_k=10):
+        """Profile every parameter's values across an operator's CSVs, one file at a time."""
+        profile = ValueProfile(top_k)
+
+        for file_path in self.iter_operator_files(operator_dir):
+            if file_path.endswith(".zip"):
+                for _, stream in iter_zip_csvs(file_path):
+                    with stream:
+                        profile.add_sections(self.parse_csv(stream))
+            else:
+                profile.add_sections(self.parse_csv(file_path))
+
+        return profile
+
+    @staticmethod
+    def save_master_template(operator, template, output_dir):
+        """Save master template as a TXT file."""
+        os.makedirs(output_dir, exist_ok=True)
+        file_path = os.path.join(output_dir, f"master_template_{operator}.txt")
+
+        with open(file_path, "w", encoding="utf-8") as f:
+            for section, params in template.items():
+                f.write(f"{section}\n")
+                f.write(", ".join(params) + "\n\n")
+
+        print(f"Master template saved: {file_path}")
+
+    def _process_operator_task(self, operator_path, cache_path=None, index_path=None, readers=0, parsers=1,
+                               large_file_size=None, chunk_workers=None, max_bytes=MAX_BYTES, queue_size=QUEUE_SIZE):
+        """Process one operator and return picklable results, including its RunStats, for process_all_operators."""
+        stats = RunStats()
+        operator_template = self.process_operator(operator_path, cache_path, index_path, readers, parsers, stats,
+                                                  large_file_size, chunk_workers, max_bytes, queue_size)
+        with stats.stage("merge"):
+            template = self.merge_templates(operator_template)
+        return operator_template, template, stats
+
+    def process_all_operators(self, base_directory, output_dir, workers=1, cache_path=None, index_path=None,
+                              readers=0, parsers=1, stats=None, large_file_size=None, chunk_workers=None,
+                              max_bytes=MAX_BYTES, queue_size=QUEUE_SIZE, renderer=None):
+        """Process each operator and generate master templates.
+
+        With workers > 1, operators are fanned out across a process pool. Results are
+        merged in operator order, so the saved templates match a serial run. cache_path
+        names a ParseCache database shared by all operators so unchanged files are not re-parsed.
+        index_path names a ParameterIndex database to record parameter postings in.
+        readers/parsers enable process_operator's pipelined I/O mode inside each operator, bounded
+        by max_bytes and queue_size.
+        Stats from every operator, including those run in worker processes, are merged into stats.
+        large_file_size/chunk_workers enable chunked parsing of large CSVs (see process_operator).
+        With renderer set, each operator's heatmap is queued as soon as its results are in.
+        """
+        stats = stats or RunStats()
+        operator_master_templates = {}
+        operator_section_counts = {}
+        operator_param_sets = {}
+
+        operators = [operator for operator in sorted(os.listdir(base_directory))
+                     if os.path.isdir(os.path.join(base_directory, operator))]
+        operator_paths = [os.path.join(base_directory, operator) for operator in operators]
+
+        task = functools.partial(self._process_operator_task, cache_path=cache_path, index_path=index_path,
+                                 readers=readers, parsers=parsers, large_file_size=large_file_size,
+                                 chunk_workers=chunk_workers, max_bytes=max_bytes, queue_size=queue_size)
+        with contextlib.ExitStack() as stack:
+            if workers > 1:
+                executor = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+                results = executor.map(task, operator_paths)
+            else:
+                results = map(task, operator_paths)
+
+            for operator, (operator_template, template, operator_stats) in zip(operators, results):
+                print(f"Processing Operator: {operator}")
+                stats.merge(operator_stats)
+
+                operator_master_templates[operator] = template
+                operator_section_counts[operator] = operator_template.section_counts
+                operator_param_sets[operator] = operator_template.param_sets()
+                self._queue_heatmap(renderer, operator, operator_param_sets[operator])
+
+                with stats.stage("save"):
+                    self.save_master_template(operator, operator_master_templates[operator], output_dir)
+                    save_operator_artifact(operator, operator_master_templates[operator], output_dir)
+
+        if cache_path:
+            with ParseCache(cache_path, self.parse_cache_key) as cache:
+                cache.evict_missing()
+
+        if index_path:
+            with ParameterIndex(index_path) as index:
+                for operator in index.operators():
+                    if operator not in operator_master_templates:
+                        index.remove_operator(operator)
+
+        return operator_master_templates, operator_section_counts, operator_param_sets
+
+    def _load_shard_files(self, operator_dir, indexed_paths, cache_path=None, large_file_size=None,
+                          chunk_workers=None):
+        """Parse one operator's files for a shard into [walk index, relative path, encoded entries] records."""
+        cache = ParseCache(cache_path, self.parse_cache_key) if cache_path else None
+        load = functools.partial(self._load, large_file_size=large_file_size, chunk_workers=chunk_workers)
+        records = []
+        for walk_index, file_path in indexed_paths:
+            entries = cache.fetch(file_path, load) if cache else load(file_path)
+            rel_path = os.path.relpath(file_path, operator_dir).replace(os.sep, "/")
+            records.append([walk_index, rel_path, encode_entries(entries)])
+        if cache:
+            cache.close()
+        return records
+
+    def process_shard(self, base_directory, output_dir, shard_index, shard_count, split_files=None, workers=1,
+                      cache_path=None, large_file_size=None, chunk_workers=None):
+        """Parse one shard's share of the operators and save it as shard_<index>_of_<count>.json in output_dir.
+
+        Operators are partitioned by a stable hash of their name, and operators with more than
+        split_files files by a hash of each file's path, so any node can compute its share
+        independently. merge_shards turns the shard files back into templates.
+        large_file_size/chunk_workers enable chunked parsing of large CSVs (see process_operator).
+        """
+        assignments = {}
+        for operator in sorted(os.listdir(base_directory)):
+            operator_dir = os.path.join(base_directory, operator)
+            if not os.path.isdir(operator_dir):
+                continue
+            files = assign_files(operator, operator_dir, list(self.iter_operator_files(operator_dir)),
+                                 shard_index, shard_count, split_files)
+            if files is not None:
+                assignments[operator] = files
+
+        operator_dirs = [os.path.join(base_directory, operator) for operator in assignments]
+        task = functools.partial(self._load_shard_files, cache_path=cache_path, large_file_size=large_file_size,
+                                 chunk_workers=chunk_workers)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(task, operator_dirs, assignments.values()))
+        else:
+            results = map(task, operator_dirs, assignments.values())
+
+        file_path = shard_path(output_dir, shard_index, shard_count)
+        save_shard(file_path, shard_index, shard_count, dict(zip(assignments, results)))
+        return file_path
+
+    def merge_shards(self, shard_dir, output_dir, index_path=None, renderer=None):
+        """Build per-operator templates from the shard files in shard_dir, as process_all_operators would.
+
+        Records are folded in each operator's original walk order, so with every shard present
+        the saved templates and the returned results match a single-node run. With renderer
+        set, each operator's heatmap is queued as soon as it is merged.
+        """
+        operator_master_templates = {}
+        operator_section_counts = {}
+        operator_param_sets = {}
+        index = ParameterIndex(index_path) if index_path else None
+        params_type = set if self.sort_parameters else dict.fromkeys
+
+        for operator, records in sorted(load_shards(shard_dir).items()):
+            print(f"Merging Operator: {operator}")
+            if index:
+                index.remove_operator(operator)
+            loaded = ((f"{operator}/{rel_path}", decode_entries(entries, params_type))
+                      for _, rel_path, entries in records)
+            operator_template = self.fold_operator_files(operator, loaded, index)
+
+            operator_master_templates[operator] = self.merge_templates(operator_template)
+            operator_section_counts[operator] = operator_template.section_counts
+            operator_param_sets[operator] = operator_template.param_sets()
+            self._queue_heatmap(renderer, operator, operator_param_sets[operator])
+            self.save_master_template(operator, operator_master_templates[operator], output_dir)
+            save_operator_artifact(operator, operator_master_templates[operator], output_dir)
+
+        if index:
+            for operator in index.operators():
+                if operator not in operator_master_templates:
+                    index.remove_operator(operator)
+            index.close()
+
+        return operator_master_templates, operator_section_counts, operator_param_sets
+
+    def load_operators(self, base_directory: str, workers: int = 1,
+                       cache_path: Optional[str] = None) -> Dict[str, OperatorTemplate]:
+        """Parse every operator under base_directory into an OperatorTemplate, in operator order.
+
+        This is the entry point for embedding the pipeline: nothing is written, and the
+        results can be passed to merge_templates and merge_global_master.
+        """
+        operators = [operator for operator in sorted(os.listdir(base_directory))
+                     if os.path.isdir(os.path.join(base_directory, operator))]
+        operator_paths = [os.path.join(base_directory, operator) for operator in operators]
+
+        task = functools.partial(self.process_operator, cache_path=cache_path)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return dict(zip(operators, executor.map(task, operator_paths)))
+        return dict(zip(operators, map(task, operator_paths)))
+
+    def merge_global_master(self, operator_templates: Mapping[str, OperatorTemplate]) -> Dict[str, List[str]]:
+        """Combine all operator templates into a single global master template."""
+        global_template = OperatorTemplate("global")
+        for operator_template in operator_templates.values():
+            global_template.merge(operator_template)
+        return self.merge_templates(global_template)
+
+    def build_global_master(self, operators_templates, output_dir):
+        """Build the global master from every operator template and save its incremental index."""
+        global_master = self.global_master()
+        for operator, template in operators_templates.items():
+            global_master.update_operator(operator, template)
+
+        os.makedirs(output_dir, exist_ok=True)
+        global_master.save(os.path.join(output_dir, GLOBAL_INDEX_FILE))
+        return global_master.template()
+
+    def refresh_operators(self, base_directory, output_dir, operators, cache_path=None, index_path=None, stats=None):
+        """Reprocess only the given operators and update the global master from the saved index.
+
+        Other operators are neither re-parsed nor re-merged; the result matches a full rebuild.
+        Operators whose directory no longer exists are dropped from the global master.
+        """
+        stats = stats or RunStats()
+        master_index_path = os.path.join(output_dir, GLOBAL_INDEX_FILE)
+        global_master = self.global_master(master_index_path)
+
+        for operator in operators:
+            operator_path = os.path.join(base_directory, operator)
+            if not os.path.isdir(operator_path):
+                print(f"Removing Operator: {operator}")
+                global_master.remove_operator(operator)
+                if index_path:
+                    with ParameterIndex(index_path) as index:
+                        index.remove_operator(operator)
+                for file_path in (artifact_path(operator, output_dir),
+                                  os.path.join(output_dir, f"master_template_{operator}.txt")):
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
+                continue
+
+            print(f"Refreshing Operator: {operator}")
+            _, template, operator_stats = self._process_operator_task(operator_path, cache_path, index_path)
+            stats.merge(operator_stats)
+            with stats.stage("save"):
+                self.save_master_template(operator, template, output_dir)
+                save_operator_artifact(operator, template, output_dir)
+            global_master.update_operator(operator, template)
+
+        global_master.save(master_index_path)
+        return global_master.template()
+
+    @staticmethod
+    def save_global_master_template(global_template, output_dir):
+        """Save the global master template as a TXT file."""
+        file_path = os.path.join(output_dir, "global_master_template.txt")
+
+        with open(file_path, "w", encoding="utf-8") as f:
+            for section, params in global_template.items():
+                f.write(f"{section}\n")
+                f.write(", ".join(params) + "\n\n")
+
+        print(f"Global master template saved: {file_path}")
+
+    def _queue_heatmap(self, renderer, operator, csv_param_sets):
+        """Queue an operator's parameter heatmap on renderer, for pipelines with operator_details."""
+        if renderer and self.operator_details and csv_param_sets:
+            renderer.parameter_heatmap(operator, ParameterMatrix(csv_param_sets))
+
+    def analyze_common_parameters(self, operator_param_sets):
+        """Analyze common parameters within and across operators, with per-CSV counts for operator_details."""
+        operator_common_params = {}
+        global_param_sets = []
+
+        for operator, csv_param_sets in operator_param_sets.items():
+            if csv_param_sets:
+                matrix = ParameterMatrix(csv_param_sets)
+                common_params = matrix.common()
+                operator_common_params[operator] = common_params
+                global_param_sets.append(matrix.union())
+                if not self.operator_details:
+                    continue
+
+                print(f"\nOperator: {operator}")
+                print("Total Parameters per CSV:")
+                for csv_file, param_count in zip(matrix.names, matrix.counts()):
+                    print(f"{csv_file}: {param_count}")
+
+                print(f"Common Parameters in all CSVs: {len(common_params)}\n")
+
+        global_common_params = set.intersection(*global_param_sets) if global_param_sets else set()
+        if self.operator_details:
+            print("\n### Global Common Parameters Across All Operators ###")
+            print("Total Unique Parameters Per Operator:")
+            for operator, param_set in operator_common_params.items():
+                print(f"{operator}: {len(param_set)}")
+            print(f"Common Parameters Across Operators: {len(global_common_params)}")
+        else:
+            print(f"\nCommon Parameters Across Operators: {len(global_common_params)}")
+
+    @staticmethod
+    def analyze_section_distribution(operator_section_counts, renderer=None):
+        """Display section type distribution across operators and queue it as a bar chart on renderer."""
+        import pandas as pd
+        section_df = pd.DataFrame(operator_section_counts).fillna(0).astype(int)
+        print("\n### Section Type Distribution Across Operators ###")
+        print(section_df)
+
+        if renderer:
+            renderer.section_distribution(operator_section_counts)
+
+    def validate_candidates(self, template_path, base_directory, output_dir, workers=1, required_index=None):
+        """Check every CSV under base_directory against a saved master template and write a JSONL report.
+
+        Every parameter of a template section is required unless required_index names a
+        ParameterIndex; then only the parameters every indexed CSV uses for that section
+        are, taken from the template's operator or from all operators for the global master.
+        """
+        required = None
+        if required_index:
+            with ParameterIndex(required_index) as index:
+                required = index.required_parameters(template_operator(template_path))
+        validator = TemplateValidator(load_master_template(template_path), required)
+        report_path = os.path.join(output_dir, VALIDATION_REPORT_FILE)
+        return validate_files(self.iter_operator_files(base_directory), validator, self.load_csvs, report_path,
+                              workers, root=base_directory)
+
+    @staticmethod
+    def write_run_report(stats, args):
+        """Print the stage and slowest-file summary and write the requested report files."""
+        stats.print_summary(args.slowest)
+        if args.report:
+            stats.write_json(args.report, args.slowest)
+        if args.prometheus:
+            stats.write_prometheus(args.prometheus, args.slowest)
+
+    def main(self, argv=None):
+        parser = argparse.ArgumentParser(
+            description="Build per-operator and global master templates from operator CSV dumps.")
+        parser.add_argument("base_directory", help="Directory with one sub-directory per operator")
+        parser.add_argument("output_dir", help="Directory the master templates are written to")
+        parser.add_argument("--workers", type=int, default=1, help="Number of operators to process in parallel")
+        parser.add_argument("--cache", dest="cache_path", help="Parse cache database; unchanged files are not re-parsed")
+        parser.add_argument("--headless", action="store_true", help="Skip analysis and never import the plotting libraries")
+        parser.add_argument("--readers", type=int, default=0,
+                            help="Reader threads per operator; > 0 overlaps scanning, reading and parsing")
+        parser.add_argument("--parsers", type=int, default=1, help="Parser threads per operator when --readers is set")
+        parser.add_argument("--read-buffer-mb", type=float, default=MAX_BYTES / (1024 * 1024),
+                            help="With --readers, MB of file data read ahead of the parsers per operator")
+        parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE,
+                            help="With --readers, files queued between the scan, read and parse stages")
+        if self.large_files:
+            parser.add_argument("--large-file-mb", type=float,
+                                help="Parse CSVs of at least this many MB in parallel chunks split at '@' sections")
+            parser.add_argument("--chunk-workers", type=int, help="Processes per large CSV (default: CPU count)")
+        parser.add_argument("--shard-index", type=int,
+                            help="Only parse this shard (0-based) and write shard_<index>_of_<count>.json to output_dir")
+        parser.add_argument("--shard-count", type=int, default=1, help="Number of shards operators are partitioned into")
+        parser.add_argument("--shard-split-files", type=int,
+                            help="Partition operators with more files than this across shards file by file")
+        parser.add_argument("--merge-shards", action="store_true",
+                            help="Merge the shard files in base_directory into templates instead of parsing operators")
+        parser.add_argument("--no-index", action="store_true",
+                            help=f"Do not write the {PARAMETER_INDEX_FILE} parameter lookup index")
+        parser.add_argument("--operator", action="append", dest="operators",
+                            help="Refresh only this operator against the saved global index (repeatable)")
+        parser.add_argument("--validate", metavar="TEMPLATE",
+                            help="Check the CSVs under base_directory against this master template TXT, or its "
+                                 "template_<operator>.json / global index JSON, and write "
+                                 f"{VALIDATION_REPORT_FILE} to output_dir instead of building templates")
+        parser.add_argument("--required-index",
+                            help="With --validate, only require parameters every CSV in this parameter index uses")
+        parser.add_argument("--watch", action="store_true",
+                            help="Keep running and update templates as operator files are added, changed or deleted")
+        parser.add_argument("--interval", type=float, default=0.5, help="Seconds between --watch polls")
+        parser.add_argument("--figures-dir", help="Where analysis figures and index.html are written (default: output_dir)")
+        parser.add_argument("--heatmap-max", type=int, default=HEATMAP_MAX,
+                            help="Heatmaps over more CSVs than this are aggregated into blocks of similar CSVs")
+        parser.add_argument("--value-profile", action="store_true",
+                            help="Also write value_profile_<operator>.json per operator")
+        parser.add_argument("--top-k", type=int, default=10, help="Most frequent values kept per parameter in value profiles")
+        parser.add_argument("--template-clusters",
+                            help="Write clusters of CSVs with near-identical parameter sets (MinHash/LSH) to this JSON file")
+        parser.add_argument("--cluster-threshold", type=float, default=0.8,
+                            help="Minimum Jaccard similarity for two CSVs to share a cluster")
+        parser.add_argument("--cluster-bands", type=int, default=16,
+                            help="LSH bands; more bands find more near-duplicates at a higher cost")
+        parser.add_argument("--num-perm", type=int, default=64,
+                            help="MinHash signature length, a multiple of --cluster-bands")
+        parser.add_argument("--report", help="Write a JSON run report with stage timings and per-file parse metrics")
+        parser.add_argument("--prometheus", help="Write run metrics to this Prometheus textfile-collector file")
+        parser.add_argument("--slowest", type=int, default=10, help="Number of slowest files listed in the run summary")
+        args = parser.parse_args(argv)
+        large_file_mb = getattr(args, "large_file_mb", None)
+        large_file_size = int(large_file_mb * 1024 * 1024) if large_file_mb else None
+        chunk_workers = getattr(args, "chunk_workers", None)
+        index_path = None if args.no_index else os.path.join(args.output_dir, PARAMETER_INDEX_FILE)
+        if index_path:
+            os.makedirs(args.output_dir, exist_ok=True)
+
+        if args.watch:
+            watcher = TemplateWatcher(self, args.base_directory, args.output_dir, self.global_master(),
+                                      args.cache_path, index_path)
+            watcher.run(args.interval)
+            return
+
+        stats = RunStats()
+
+        if args.validate:
+            with stats.stage("validate"):
+                self.validate_candidates(args.validate, args.base_directory, args.output_dir, args.workers,
+                                         args.required_index)
+            self.write_run_report(stats, args)
+            return
+
+        if args.operators:
+            global_master_template = self.refresh_operators(args.base_directory, args.output_dir, args.operators,
+                                                            args.cache_path, index_path, stats)
+            with stats.stage("save"):
+                self.save_global_master_template(global_master_template, args.output_dir)
+            self.write_run_report(stats, args)
+            return
+
+        if args.shard_index is not None:
+            if not 0 <= args.shard_index < args.shard_count:
+                parser.error("--shard-index must be between 0 and --shard-count - 1")
+            with stats.stage("shard"):
+                self.process_shard(args.base_directory, args.output_dir, args.shard_index, args.shard_count,
+                                   args.shard_split_files, args.workers, args.cache_path, large_file_size,
+                                   chunk_workers)
+            self.write_run_report(stats, args)
+            return
+
+        if args.merge_shards and args.value_profile:
+            parser.error("--value-profile reads operator files and cannot be used with --merge-shards")
+
+        # Started first so each operator's figures render while the next operator is parsed
+        renderer = None if args.headless else FigureRenderer(args.figures_dir or args.output_dir, args.heatmap_max)
+        if args.merge_shards:
+            with stats.stage("merge"):
+                operator_templates, operator_counts, operator_param_sets = self.merge_shards(
+                    args.base_directory, args.output_dir, index_path, renderer)
+        else:
+            operator_templates, operator_counts, operator_param_sets = self.process_all_operators(
+                args.base_directory, args.output_dir, args.workers, args.cache_path, index_path, args.readers,
+                args.parsers, stats, large_file_size, chunk_workers, int(args.read_buffer_mb * 1024 * 1024),
+                args.queue_size, renderer)
+
+        if renderer:
+            with stats.stage("analyze"):
+                self.analyze_common_parameters(operator_param_sets)
+                self.analyze_section_distribution(operator_counts, renderer)
+
+        if args.value_profile:
+            for operator in operator_templates:
+                with stats.stage("profile"):
+                    profile = self.profile_operator_values(os.path.join(args.base_directory, operator), args.top_k)
+                    profile_path = os.path.join(args.output_dir, f"value_profile_{operator}.json")
+                    profile.save(profile_path)
+                print(f"Value profile saved: {profile_path}")
+
+        if args.template_clusters:
+            with stats.stage("cluster"):
+                clusters = find_template_clusters(operator_param_sets, args.num_perm, args.cluster_bands,
+                                                  args.cluster_threshold)
+                save_clusters(clusters, args.template_clusters)
+
+        with stats.stage("merge"):
+            global_master_template = self.build_global_master(operator_templates, args.output_dir)
+        with stats.stage("save"):
+            self.save_global_master_template(global_master_template, args.output_dir)
+        if renderer:
+            with stats.stage("render"):
+                renderer.close()
+        self.write_run_report(stats, args)
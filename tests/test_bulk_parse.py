@@ -0,0 +1,62 @@
+import io
+import random
+
+import pytest
+
+import Updatedmaster
+
+ATOMS = ["@S1", "@S2", " @S3", "'@S4'", '"@S5"', "@", "a@b", "P1", "P2", "P3", " P4 ", "", " ", "'", '""', '"x,y"',
+         "\t", "v1", "v2", '"q""q"', "'v'", '"@S6"', "x\ty", ' "@S7"']
+
+class Unseekable(io.BytesIO):
+    def seekable(self):
+        return False
+
+def random_csv(rng):
+    lines = []
+    for _ in range(rng.randint(0, 15)):
+        if rng.random() < 0.05:
+            lines.append("")
+        elif rng.random() < 0.05:
+            lines.append('"multi\nline",' + rng.choice(ATOMS))  # A quoted cell spanning lines
+        else:
+            lines.append(",".join(rng.choice(ATOMS) for _ in range(rng.randint(1, 5))))
+    if rng.random() < 0.3:
+        lines = [line.replace('"', "") for line in lines]
+    return rng.choice(["\n", "\r\n"]).join(lines) + rng.choice(["", "\n", "\r\n"])
+
+def canonical(sections):
+    return [(section, list(data["parameters"]),
+             [(block["parameters"], [(column.values, list(column.codes)) for column in block["columns"]],
+               block["rows"], block["missing"], block["extra"]) for block in data["values"].blocks])
+            for section, data in sections.items()]
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_bulk_parse_matches_the_row_parser(tmp_path, seed):
+    rng = random.Random(seed)
+    csv_path = str(tmp_path / "f.csv")
+    bulk_parsed = 0
+    for _ in range(1000):
+        text = random_csv(rng)
+        with open(csv_path, "w", newline="") as f:
+            f.write(text)
+        with open(csv_path, encoding="utf-8") as f:
+            bulk_parsed += Updatedmaster._parse_bulk(f.read()) is not None
+        for parameters_only in (False, True):
+            with open(csv_path, encoding="utf-8") as f:
+                expected = canonical(Updatedmaster._parse_rows(f, parameters_only))
+            assert canonical(Updatedmaster.parse_csv(csv_path, parameters_only)) == expected, (text, parameters_only)
+    assert bulk_parsed > 500  # Most files must take the bulk path for the comparison to mean anything
+
+@pytest.mark.parametrize("seekable", [True, False])
+def test_files_over_the_bulk_limit_are_streamed(monkeypatch, seekable):
+    monkeypatch.setattr(Updatedmaster, "BULK_MAX_CHARS", 7)
+    rng = random.Random(3)
+    for _ in range(300):
+        data = random_csv(rng).encode("utf-8")
+        for parameters_only in (False, True):
+            with io.TextIOWrapper(io.BytesIO(data), encoding="utf-8") as f:
+                expected = canonical(Updatedmaster._parse_rows(f, parameters_only))
+            raw = io.BytesIO(data) if seekable else Unseekable(data)
+            with io.TextIOWrapper(raw, encoding="utf-8") as stream:
+                assert canonical(Updatedmaster.parse_csv(stream, parameters_only)) == expected, (data, parameters_only)
@@ -0,0 +1,97 @@
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+import Mastertemplate
+import Updatedmaster
+from template_artifacts import GLOBAL_INDEX_FILE, GlobalMaster
+from template_model import OperatorTemplate
+
+PIPELINES = [(Mastertemplate, True), (Updatedmaster, False)]
+
+def random_template(rng):
+    template = {}
+    for _ in range(rng.randint(0, 6)):
+        params = [f"p{rng.randint(0, 30)}" for _ in range(rng.randint(0, 8))]
+        template[f"@S{rng.randint(0, 8)}"] = list(dict.fromkeys(params))
+    return template
+
+def operator_template(template):
+    model = OperatorTemplate("op")
+    model.merge_sections(template)
+    return model
+
+@pytest.mark.parametrize("pipeline, sort_parameters", PIPELINES)
+def test_incremental_updates_match_a_full_merge(tmp_path, pipeline, sort_parameters):
+    rng = random.Random(5)
+    index_path = str(tmp_path / "index.json")
+    for _ in range(100):
+        global_master = GlobalMaster(sort_parameters, keep_empty_sections=True)
+        current = {}
+        for _ in range(15):
+            operator = f"op{rng.randint(0, 6)}"
+            if rng.random() < 0.2:
+                global_master.remove_operator(operator)
+                current.pop(operator, None)
+            else:
+                current[operator] = random_template(rng)
+                global_master.update_operator(operator, current[operator])
+            if rng.random() < 0.2:
+                global_master.save(index_path)
+                global_master = GlobalMaster.load(index_path, sort_parameters, keep_empty_sections=True)
+
+            expected = pipeline.PIPELINE.merge_global_master(
+                {operator: operator_template(current[operator]) for operator in sorted(current)})
+            assert list(global_master.template().items()) == list(expected.items())
+
+def write_corpus(base_directory):
+    (base_directory / "opA").mkdir(parents=True)
+    (base_directory / "opB").mkdir()
+    (base_directory / "opA" / "f.csv").write_text("pre,row\n@S1\na,b\n1,2\n@S2\nc\n")
+    (base_directory / "opB" / "g.csv").write_text("@S2\nd,c\n@S1\nb,z\n")
+
+@pytest.mark.parametrize("pipeline, sort_parameters", PIPELINES)
+def test_refresh_matches_a_full_rebuild(tmp_path, capsys, pipeline, sort_parameters):
+    base_directory = tmp_path / "operators"
+    write_corpus(base_directory)
+    incremental = str(tmp_path / "incremental")
+    pipeline.main([str(base_directory), incremental, "--headless"])
+
+    with open(base_directory / "opB" / "g.csv", "a") as f:
+        f.write("@S3\ny\n")
+    (base_directory / "opC").mkdir()
+    (base_directory / "opC" / "h.csv").write_text("@S1\nq\n")
+    pipeline.main([str(base_directory), incremental, "--headless", "--operator", "opB", "--operator", "opC"])
+
+    full = str(tmp_path / "full")
+    pipeline.main([str(base_directory), full, "--headless"])
+    for name in ("global_master_template.txt", "master_template_opB.txt", "master_template_opC.txt"):
+        with open(f"{incremental}/{name}") as got, open(f"{full}/{name}") as expected:
+            assert got.read() == expected.read()
+
+def test_global_master_keeps_sections_without_parameters(tmp_path):
+    base_directory = tmp_path / "operators"
+    write_corpus(base_directory)
+    operator_templates = Updatedmaster.PIPELINE.load_operators(str(base_directory))
+
+    global_template = Updatedmaster.PIPELINE.merge_global_master(operator_templates)
+    assert global_template == {None: [], "@S1": ["a", "b", "z"], "@S2": ["c", "d"]}
+    assert Updatedmaster.PIPELINE.build_global_master(
+        {operator: Updatedmaster.merge_templates(template) for operator, template in operator_templates.items()},
+        str(tmp_path / "out")) == global_template
+
+def test_global_index_bytes_do_not_depend_on_hash_seed(tmp_path):
+    base_directory = tmp_path / "operators"
+    write_corpus(base_directory)
+    (base_directory / "opB" / "h.csv").write_text("".join(f"@T{number}\nt{number}\n" for number in range(20)))
+    script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Updatedmaster.py")
+    outputs = []
+    for seed in ("1", "2", "3"):
+        output_dir = tmp_path / f"out{seed}"
+        subprocess.run([sys.executable, script, str(base_directory), str(output_dir), "--headless", "--no-index"],
+                       check=True, stdout=subprocess.DEVNULL, env=dict(os.environ, PYTHONHASHSEED=seed))
+        outputs.append((output_dir / GLOBAL_INDEX_FILE).read_bytes())
+    assert outputs[0] == outputs[1] == outputs[2]
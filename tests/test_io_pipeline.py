@@ -0,0 +1,62 @@
+import threading
+
+import io_pipeline
+import Mastertemplate
+from io_pipeline import run_pipeline
+from run_report import RunStats
+
+def write_files(directory, sizes):
+    paths = []
+    for number, size in enumerate(sizes):
+        path = directory / f"f{number}.csv"
+        path.write_bytes(b"x" * size)
+        paths.append(str(path))
+    return paths
+
+def test_bytes_in_flight_stay_within_the_budget(tmp_path, monkeypatch):
+    paths = write_files(tmp_path, [40, 30, 50, 10, 200, 20, 60])
+    lock = threading.Lock()
+    in_flight = [0, 0]  # current, peak
+    read_bytes = io_pipeline.read_bytes
+
+    def tracked_read(path):
+        data = read_bytes(path)
+        with lock:
+            in_flight[0] += len(data)
+            in_flight[1] = max(in_flight[1], in_flight[0])
+        return data
+
+    monkeypatch.setattr(io_pipeline, "read_bytes", tracked_read)
+    results = []
+    for path, size in run_pipeline(paths, lambda path, data: len(data), readers=3, parsers=2, max_bytes=100):
+        results.append((path, size))
+        with lock:
+            in_flight[0] -= size
+    assert results == [(path, size) for path, size in zip(paths, [40, 30, 50, 10, 200, 20, 60])]
+    assert in_flight[1] <= 200  # Only the oversized file exceeds the budget, and only on its own
+
+def test_cache_hits_and_large_files_are_not_read(tmp_path, monkeypatch):
+    paths = write_files(tmp_path, [5, 5, 50])
+    read = []
+    read_bytes = io_pipeline.read_bytes
+    monkeypatch.setattr(io_pipeline, "read_bytes", lambda path: read.append(path) or read_bytes(path))
+
+    results = list(run_pipeline(paths, lambda path, data: data, readers=2, max_read=20,
+                                lookup=lambda path: "cached" if path == paths[0] else None))
+    assert results == [(paths[0], "cached"), (paths[1], b"xxxxx"), (paths[2], None)]
+    assert read == [paths[1]]
+
+def test_pipelined_runs_use_the_cache(tmp_path):
+    operator_dir = tmp_path / "op"
+    operator_dir.mkdir()
+    for number in range(6):
+        (operator_dir / f"f{number}.csv").write_text(f"@S\na,p{number}\n@T\nt{number % 2}\n")
+    cache_path = str(tmp_path / "cache.db")
+    pipeline = Mastertemplate.PIPELINE
+    expected = Mastertemplate.merge_templates(pipeline.process_operator(str(operator_dir)))
+
+    for files_parsed in (6, 0):
+        stats = RunStats()
+        operator_template = pipeline.process_operator(str(operator_dir), cache_path, readers=2, stats=stats)
+        assert Mastertemplate.merge_templates(operator_template) == expected
+        assert stats.counters.get("files_parsed", 0) == files_parsed
@@ -0,0 +1,58 @@
+import random
+
+import Mastertemplate
+from large_csv import parse_large_csv, section_chunks
+
+CELLS = ["@S1", "@S2", "@S3", "a", "b", '"q"', "'x'", "", " ", "@", "v1", "v2", "c,d"]
+HEADERS = ["@S1", "@S2", "@S3", "@S4,,", "  @S5", '"@S6"', "@S7,a"]
+
+def random_csv(rng):
+    lines = []
+    for _ in range(rng.randint(0, 40)):
+        if rng.random() < 0.2:
+            line = rng.choice(HEADERS)
+        else:
+            line = ",".join(rng.choice(CELLS) for _ in range(rng.randint(0, 5)))
+            if rng.random() < 0.3:
+                line += ","  # Continued on the next line
+        lines.append(line)
+    newline = rng.choice(["\n", "\r\n"])
+    return newline.join(lines) + (newline if rng.random() < 0.5 else "")
+
+def canonical(sections):
+    return [(section, sorted(data["parameters"]),
+             [(block["parameters"], [column.values for column in block["columns"]],
+               [list(column.codes) for column in block["columns"]], block["rows"], block["missing"], block["extra"])
+              for block in data["values"].blocks])
+            for section, data in sections.items()]
+
+def test_chunked_parse_matches_a_serial_parse(tmp_path):
+    rng = random.Random(1)
+    csv_path = str(tmp_path / "large.csv")
+    for _ in range(500):
+        text = random_csv(rng)
+        with open(csv_path, "w", newline="") as f:
+            f.write(text)
+        for parameters_only in (False, True):
+            expected = canonical(Mastertemplate.parse_csv(csv_path, parameters_only))
+            for chunk_size in (1, 3, 17):
+                chunked = parse_large_csv(csv_path, Mastertemplate.parse_csv, parameters_only, workers=1,
+                                          chunk_size=chunk_size)
+                assert canonical(chunked) == expected, (text, parameters_only, chunk_size)
+
+def test_chunks_start_at_section_lines(tmp_path):
+    csv_path = tmp_path / "large.csv"
+    csv_path.write_bytes(b"x,y\n@S1\na\n1\n@S2\nb\n@S3\nc\n")
+    data = csv_path.read_bytes()
+
+    chunks = section_chunks(str(csv_path), 1)
+    assert chunks[0][0] == 0 and chunks[-1][1] == len(data)
+    assert all(data[start:start + 1] == b"@" for start, _ in chunks[1:])
+
+def test_worker_processes_match_a_serial_parse(tmp_path):
+    csv_path = tmp_path / "large.csv"
+    csv_path.write_text("".join(f"@S{number % 7}\np{number},q\n{number},1\n" for number in range(200)))
+
+    expected = canonical(Mastertemplate.parse_csv(str(csv_path)))
+    chunked = parse_large_csv(str(csv_path), Mastertemplate.parse_csv, workers=2, chunk_size=64)
+    assert canonical(chunked) == expected
@@ -0,0 +1,56 @@
+import Updatedmaster
+import template_pipeline
+from param_index import ParameterIndex
+
+def test_batched_index_matches_per_file_writes(tmp_path, monkeypatch):
+    operator_dir = tmp_path / "op"
+    operator_dir.mkdir()
+    for number in range(5):
+        (operator_dir / f"f{number}.csv").write_text(f"@S{number % 2}\na,p{number}\n")
+    monkeypatch.setattr(template_pipeline, "BATCH_FILES", 2)
+
+    batched_path = str(tmp_path / "batched.sqlite")
+    Updatedmaster.PIPELINE.process_operator(str(operator_dir), index_path=batched_path)
+    with ParameterIndex(str(tmp_path / "single.sqlite")) as index:
+        for number in range(5):
+            index.add_file("op", f"f{number}.csv", {f"@S{number % 2}": ["a", f"p{number}"]})
+        expected = index.lookup("a"), index.lookup("p3")
+
+    with ParameterIndex(batched_path) as index:
+        assert (index.lookup("a"), index.lookup("p3")) == expected
+        assert index.lookup("p3") == [("op", "@S1", "f3.csv")]
+
+def test_add_files_replaces_earlier_postings(tmp_path):
+    with ParameterIndex(str(tmp_path / "index.sqlite")) as index:
+        index.add_files("op", [("f.csv", {"@S": ["a", "b"]}), ("g.csv", {"@S": ["a"]})])
+        index.add_files("op", [("f.csv", {"@T": ["b"]})])
+        assert index.lookup("a") == [("op", "@S", "g.csv")]
+        assert index.lookup("b") == [("op", "@T", "f.csv")]
+
+def test_rerun_only_rewrites_changed_files(tmp_path, monkeypatch):
+    operator_dir = tmp_path / "op"
+    operator_dir.mkdir()
+    for number in range(4):
+        (operator_dir / f"f{number}.csv").write_text(f"@S\na,p{number}\n")
+    index_path = str(tmp_path / "index.sqlite")
+    cache_path = str(tmp_path / "cache.sqlite")
+    Updatedmaster.PIPELINE.process_operator(str(operator_dir), cache_path, index_path)
+
+    written = []
+    add_files = ParameterIndex.add_files
+
+    def recording_add_files(self, operator, files, stamps=None):
+        written.extend(path for path, _ in files)
+        add_files(self, operator, files, stamps)
+
+    monkeypatch.setattr(ParameterIndex, "add_files", recording_add_files)
+    Updatedmaster.PIPELINE.process_operator(str(operator_dir), cache_path, index_path)
+    assert written == []
+
+    (operator_dir / "f1.csv").write_text("@S\na,q1,r1\n")
+    (operator_dir / "f2.csv").unlink()
+    Updatedmaster.PIPELINE.process_operator(str(operator_dir), cache_path, index_path)
+    assert written == ["f1.csv"]
+    with ParameterIndex(index_path) as index:
+        assert index.lookup("a") == [("op", "@S", "f0.csv"), ("op", "@S", "f1.csv"), ("op", "@S", "f3.csv")]
+        assert index.lookup("p1") == [] and index.lookup("q1") == [("op", "@S", "f1.csv")]
@@ -0,0 +1,27 @@
+import Mastertemplate
+import Updatedmaster
+from parse_cache import ParseCache
+
+def test_entries_are_kept_per_parser(tmp_path):
+    csv_path = tmp_path / "f.csv"
+    csv_path.write_text("@S\na\n")
+    cache_path = str(tmp_path / "cache.db")
+
+    with ParseCache(cache_path, "first/1") as cache:
+        assert cache.fetch(str(csv_path), lambda path: "first") == "first"
+    with ParseCache(cache_path, "second/1") as cache:
+        assert cache.fetch(str(csv_path), lambda path: "second") == "second"
+    with ParseCache(cache_path, "first/1") as cache:
+        assert cache.fetch(str(csv_path), lambda path: "reparsed") == "first"
+
+def test_pipelines_sharing_a_cache_match_uncached_runs(tmp_path):
+    operator_dir = tmp_path / "op"
+    operator_dir.mkdir()
+    # The two pipelines tokenize the quoted cell differently
+    (operator_dir / "f.csv").write_text('@S\n"x,y",z\n1,2\n')
+    cache_path = str(tmp_path / "cache.db")
+
+    for pipeline in (Mastertemplate, Updatedmaster, Mastertemplate):
+        expected = pipeline.merge_templates(pipeline.PIPELINE.process_operator(str(operator_dir)))
+        cached = pipeline.merge_templates(pipeline.PIPELINE.process_operator(str(operator_dir), cache_path=cache_path))
+        assert cached == expected
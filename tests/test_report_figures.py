@@ -0,0 +1,29 @@
+import os
+
+import Updatedmaster
+
+class RecordingRenderer:
+    def __init__(self, events):
+        self.events = events
+
+    def parameter_heatmap(self, operator, matrix):
+        self.events.append(("heatmap", operator, len(matrix.names)))
+
+def test_heatmaps_are_queued_as_each_operator_is_processed(tmp_path, monkeypatch):
+    base_directory = tmp_path / "operators"
+    for operator in ("opA", "opB"):
+        (base_directory / operator).mkdir(parents=True)
+        for name in ("a", "b"):
+            (base_directory / operator / f"{name}.csv").write_text(f"@S\n{name},{operator}\n")
+
+    events = []
+    pipeline = Updatedmaster.PIPELINE
+    process_operator_task = pipeline._process_operator_task
+
+    def recording_task(operator_path, *args, **kwargs):
+        events.append(("process", os.path.basename(operator_path)))
+        return process_operator_task(operator_path, *args, **kwargs)
+
+    monkeypatch.setattr(pipeline, "_process_operator_task", recording_task)
+    pipeline.process_all_operators(str(base_directory), str(tmp_path / "out"), renderer=RecordingRenderer(events))
+    assert events == [("process", "opA"), ("heatmap", "opA", 2), ("process", "opB"), ("heatmap", "opB", 2)]
@@ -0,0 +1,50 @@
+import os
+import random
+
+import pytest
+
+import Mastertemplate
+import Updatedmaster
+from param_index import ParameterIndex
+from template_pipeline import PARAMETER_INDEX_FILE
+
+def write_corpus(base_directory, rng):
+    for operator in range(6):
+        operator_dir = base_directory / f"op{operator}"
+        operator_dir.mkdir(parents=True)
+        for number in range(rng.randint(1, 6)):
+            lines = []
+            for _ in range(rng.randint(1, 4)):
+                lines.append(f"@S{rng.randint(0, 5)}")
+                lines.append(",".join(f"p{rng.randint(0, 20)}" for _ in range(rng.randint(1, 5))))
+                lines.append("1,2")
+            (operator_dir / f"f{number}.csv").write_text("\n".join(lines) + "\n")
+
+def postings(index_path):
+    with ParameterIndex(index_path) as index:
+        return sorted(index.conn.execute(
+            "SELECT f.operator, f.path, s.name, pa.name FROM postings p JOIN files f ON f.id = p.file_id "
+            "JOIN sections s ON s.id = p.section_id JOIN parameters pa ON pa.id = p.parameter_id"))
+
+@pytest.mark.parametrize("pipeline", [Mastertemplate, Updatedmaster])
+@pytest.mark.parametrize("split_files", [[], ["--shard-split-files", "2"]])
+def test_merged_shards_match_a_single_node_run(tmp_path, capsys, pipeline, split_files):
+    base_directory = tmp_path / "operators"
+    write_corpus(base_directory, random.Random(18))
+    single = str(tmp_path / "single")
+    pipeline.main([str(base_directory), single, "--headless"])
+
+    shard_dir = str(tmp_path / "shards")
+    for shard_index in range(3):
+        pipeline.main([str(base_directory), shard_dir, "--headless", "--shard-index", str(shard_index),
+                       "--shard-count", "3", *split_files])
+    merged = str(tmp_path / "merged")
+    pipeline.main([shard_dir, merged, "--headless", "--merge-shards"])
+
+    outputs = sorted(name for name in os.listdir(single) if name.endswith(".txt"))
+    assert outputs == sorted(name for name in os.listdir(merged) if name.endswith(".txt"))
+    for name in outputs:
+        with open(os.path.join(single, name)) as expected, open(os.path.join(merged, name)) as got:
+            assert got.read() == expected.read(), name
+    assert postings(os.path.join(merged, PARAMETER_INDEX_FILE)) == \
+        postings(os.path.join(single, PARAMETER_INDEX_FILE))
@@ -0,0 +1,49 @@
+import csv
+import json
+import os
+
+import Updatedmaster
+from template_pipeline import VALIDATION_REPORT_FILE
+
+def write_operator(base_directory):
+    operator_dir = base_directory / "op"
+    operator_dir.mkdir(parents=True)
+    (operator_dir / "a.csv").write_text('@S\n"x, y",z\n1,2\n')
+    (operator_dir / "b.csv").write_text("@S\nz\n@T\nt\n")
+    return operator_dir
+
+def report_lines(output_dir):
+    with open(os.path.join(output_dir, VALIDATION_REPORT_FILE)) as f:
+        return [json.loads(line) for line in f]
+
+def test_templates_round_trip_through_their_artifacts(tmp_path, capsys):
+    base_directory = tmp_path / "operators"
+    write_operator(base_directory)
+    templates = str(tmp_path / "templates")
+    Updatedmaster.main([str(base_directory), templates, "--headless"])
+
+    for template in ("master_template_op.txt", "template_op.json", "global_master_template.txt"):
+        output_dir = str(tmp_path / template)
+        Updatedmaster.main([str(base_directory), output_dir, "--validate", os.path.join(templates, template)])
+        lines = report_lines(output_dir)
+        assert [line["file"] for line in lines] == ["op/a.csv", "op/b.csv"]
+        assert "unknown_parameters" not in lines[0], template
+        assert lines[1]["missing_parameters"] == {"@S": ["x, y"]}
+
+def test_unparsable_candidates_are_reported(tmp_path, capsys):
+    base_directory = tmp_path / "operators"
+    operator_dir = write_operator(base_directory)
+    templates = str(tmp_path / "templates")
+    Updatedmaster.main([str(base_directory), templates, "--headless"])
+    (operator_dir / "big.csv").write_text('@S\n"' + "v" * 200 + '"\n')
+
+    limit = csv.field_size_limit()
+    csv.field_size_limit(100)
+    try:
+        Updatedmaster.main([str(base_directory), str(tmp_path / "report"), "--validate",
+                            os.path.join(templates, "master_template_op.txt")])
+    finally:
+        csv.field_size_limit(limit)
+    lines = report_lines(str(tmp_path / "report"))
+    assert [line["file"] for line in lines] == ["op/a.csv", "op/b.csv", "op/big.csv"]
+    assert lines[2]["error"].startswith("Error: field larger than field limit")
@@ -0,0 +1,34 @@
+import Updatedmaster
+from value_profile import ValueProfile
+
+def profile_of(tmp_path, text):
+    csv_path = tmp_path / "f.csv"
+    csv_path.write_text(text)
+    profile = ValueProfile()
+    profile.add_sections(Updatedmaster.parse_csv(str(csv_path)))
+    return profile
+
+def test_blank_cells_keep_values_under_their_parameters(tmp_path):
+    profile = profile_of(tmp_path, "@S\na,b,c\n1,,3\n4,5,6,,\n7\n")
+    report = profile.report()["@S"]
+
+    assert report["a"]["top_values"] == [("1", 1), ("4", 1), ("7", 1)]
+    assert report["b"]["empty"] == 1
+    assert report["b"]["missing"] == 1
+    assert dict(report["c"]["top_values"]) == {"3": 1, "6": 1}
+    assert report["c"]["missing"] == 1
+    assert profile.extra_cells["@S"] == 0  # Trailing blank cells are not extra
+
+def test_bulk_and_row_parsers_store_the_same_values(tmp_path):
+    text = '@S\na,b,c\n1,,"3"\n\' \',x,,y\n'
+    csv_path = tmp_path / "f.csv"
+    csv_path.write_text(text)
+    with open(csv_path, encoding="utf-8") as f:
+        rows = Updatedmaster._parse_rows(f)
+    bulk = Updatedmaster._parse_bulk(text)
+
+    def columns(sections):
+        return [[column.values for column in block["columns"]] + [block["extra"]]
+                for block in sections["@S"]["values"].blocks]
+
+    assert columns(bulk) == columns(rows) == [[["1", ""], ["", "x"], ["3", ""], 1]]
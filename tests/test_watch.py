@@ -0,0 +1,107 @@
+import csv
+import io
+import os
+import zipfile
+
+import pytest
+
+import Updatedmaster
+from param_index import ParameterIndex
+from parse_cache import ParseCache
+from template_artifacts import GlobalMaster
+from template_pipeline import PARAMETER_INDEX_FILE
+from watch import TemplateWatcher
+
+def postings(index_path):
+    with ParameterIndex(index_path) as index:
+        return sorted(index.conn.execute(
+            "SELECT f.operator, f.path, s.name, pa.name FROM postings p JOIN files f ON f.id = p.file_id "
+            "JOIN sections s ON s.id = p.section_id JOIN parameters pa ON pa.id = p.parameter_id"))
+
+def write_zip(zip_path, members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zip_file:
+        for name, text in members.items():
+            zip_file.writestr(name, text)
+    zip_path.write_bytes(buffer.getvalue())
+
+@pytest.fixture
+def watcher(tmp_path, capsys):
+    operator_dir = tmp_path / "operators" / "op"
+    operator_dir.mkdir(parents=True)
+    (operator_dir / "a.csv").write_text("@S\na,b\n")
+    (operator_dir / "b.csv").write_text("@S\nb,c\n")
+    write_zip(operator_dir / "c.zip", {"x.csv": "@T\nx\n", "y.csv": "@T\ny\n"})
+    watcher = TemplateWatcher(Updatedmaster.PIPELINE, str(tmp_path / "operators"), str(tmp_path / "out"),
+                              GlobalMaster(sort_parameters=False, keep_empty_sections=True),
+                              index_path=str(tmp_path / "index.sqlite"))
+    assert watcher.poll() == ["op"]
+    return watcher
+
+def rebuilt_postings(watcher, tmp_path):
+    index_path = str(tmp_path / "rebuilt.sqlite")
+    Updatedmaster.PIPELINE.process_operator(f"{watcher.base_directory}/op", index_path=index_path)
+    return postings(index_path)
+
+def test_index_tracks_changed_and_deleted_files(watcher, tmp_path):
+    operator_dir = tmp_path / "operators" / "op"
+    (operator_dir / "a.csv").write_text("@S\na,z\n")
+    (operator_dir / "b.csv").unlink()
+    write_zip(operator_dir / "c.zip", {"x.csv": "@T\nw\n"})
+    (operator_dir / "d.csv").write_text("@U\nd\n")
+
+    assert watcher.poll() == ["op"]
+    assert postings(watcher.index_path) == rebuilt_postings(watcher, tmp_path)
+    assert watcher.templates["op"] == {"@S": ["a", "z"], "@T": ["w"], "@U": ["d"]}
+
+def test_unparsable_file_is_skipped(watcher, tmp_path):
+    limit = csv.field_size_limit()
+    csv.field_size_limit(100)
+    try:
+        (tmp_path / "operators" / "op" / "big.csv").write_text("@S\n" + '"' + "v" * 200 + '"\n')
+        assert watcher.poll() == ["op"]
+    finally:
+        csv.field_size_limit(limit)
+    assert watcher.templates["op"] == {"@S": ["a", "b", "c"], "@T": ["x", "y"]}
+
+def test_first_poll_drops_operators_removed_since_an_earlier_run(tmp_path):
+    base_directory = tmp_path / "operators"
+    for operator in ("keep", "gone"):
+        (base_directory / operator).mkdir(parents=True)
+        (base_directory / operator / "a.csv").write_text(f"@S\n{operator}\n")
+    output_dir = tmp_path / "out"
+    Updatedmaster.main([str(base_directory), str(output_dir), "--headless"])
+    (base_directory / "gone" / "a.csv").unlink()
+    (base_directory / "gone").rmdir()
+
+    watcher = TemplateWatcher(Updatedmaster.PIPELINE, str(base_directory), str(output_dir),
+                              Updatedmaster.PIPELINE.global_master(), index_path=str(output_dir / PARAMETER_INDEX_FILE))
+    assert watcher.poll() == ["gone", "keep"]
+    assert not (output_dir / "master_template_gone.txt").exists()
+    assert not (output_dir / "template_gone.json").exists()
+    with ParameterIndex(watcher.index_path) as index:
+        assert index.operators() == ["keep"]
+
+def test_cache_entries_of_deleted_files_are_evicted(tmp_path):
+    operator_dir = tmp_path / "operators" / "op"
+    operator_dir.mkdir(parents=True)
+    for name in ("a", "b"):
+        (operator_dir / f"{name}.csv").write_text(f"@S\n{name}\n")
+    cache_path = str(tmp_path / "cache.db")
+    with ParseCache(cache_path, Updatedmaster.PARSE_CACHE_KEY) as cache:
+        cache.fetch(str(tmp_path / "operators" / "op" / "a.csv"), Updatedmaster._load_csvs)
+        cache.conn.execute("INSERT INTO entries VALUES (?, ?, 0, 0, '', x'')",
+                           (Updatedmaster.PARSE_CACHE_KEY, str(operator_dir / "old.csv")))
+        cache.conn.commit()
+
+    def cached_paths():
+        with ParseCache(cache_path, Updatedmaster.PARSE_CACHE_KEY) as cache:
+            return sorted(os.path.basename(path) for (path,) in cache.conn.execute("SELECT path FROM entries"))
+
+    watcher = TemplateWatcher(Updatedmaster.PIPELINE, str(tmp_path / "operators"), str(tmp_path / "out"),
+                              Updatedmaster.PIPELINE.global_master(), cache_path)
+    watcher.poll()
+    assert cached_paths() == ["a.csv", "b.csv"]
+    (operator_dir / "a.csv").unlink()
+    watcher.poll()
+    assert cached_paths() == ["b.csv"]
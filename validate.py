@@ -0,0 +1,161 @@
+import os
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from template_artifacts import GLOBAL_INDEX_FILE, GlobalMaster, artifact_path, load_operator_artifact
+
+def load_master_template(file_path):
+    """Load the {section: [parameters]} template a master template TXT was saved from.
+
+    The template is read from the JSON saved next to the TXT, template_<operator>.json or
+    the global master index, since the TXT's ", "-joined lines cannot hold parameter names
+    that contain ", ". Either JSON file may also be given directly.
+    """
+    directory, name = os.path.split(file_path)
+    operator = template_operator(file_path)
+    if operator is not None:
+        return load_operator_artifact(artifact_path(operator, directory))[1]
+    if name in ("global_master_template.txt", GLOBAL_INDEX_FILE):
+        index_path = os.path.join(directory, GLOBAL_INDEX_FILE)
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+        return GlobalMaster.load(index_path, index.get("sort_parameters"), index.get("keep_empty_sections")).template()
+    raise ValueError(f"Not a master template or template artifact: {file_path}")
+
+def template_operator(file_path):
+    """Operator name of a master_template_<operator>.txt or template_<operator>.json path, else None."""
+    name = os.path.basename(file_path)
+    if name.startswith("master_template_") and name.endswith(".txt"):
+        return name[len("master_template_"):-len(".txt")]
+    if name.startswith("template_") and name.endswith(".json"):
+        return name[len("template_"):-len(".json")]
+    return None
+
+class TemplateValidator:
+    """Check parsed CSVs against a master template compiled to bitmasks.
+
+    Every template parameter gets one bit of a shared vocabulary, and each section is
+    compiled to the mask of its allowed parameters and the mask of its required ones
+    (by default all of them). A CSV section is then checked with two AND-NOTs: parameters
+    outside the allowed mask are unknown, required bits it does not set are missing.
+    """
+
+    def __init__(self, template, required=None):
+        self.bits = {}
+        self.names = []
+        self.sections = {section: self._mask(params) for section, params in template.items()}
+        self.required = self.sections if required is None else {
+            section: self._mask(params) & self.sections[section]
+            for section, params in required.items() if section in self.sections}
+
+    def _mask(self, params):
+        mask = 0
+        for param in params:
+            bit = self.bits.get(param)
+            if bit is None:
+                bit = self.bits[param] = 1 << len(self.names)
+                self.names.append(param)
+            mask |= bit
+        return mask
+
+    def _decode(self, mask):
+        names = []
+        while mask:
+            low = mask & -mask
+            names.append(self.names[low.bit_length() - 1])
+            mask ^= low
+        return sorted(names)
+
+    def check(self, section_params):
+        """Return the violations of one CSV's {section: parameters}, or an empty dict if it conforms."""
+        bits_of = self.bits.get
+        unknown_sections = []
+        unknown_parameters = {}
+        missing_parameters = {}
+
+        for section, params in section_params.items():
+            allowed = self.sections.get(section)
+            if allowed is None:
+                unknown_sections.append(section)
+                continue
+
+            mask = 0
+            unknown = []
+            for param in params:
+                bit = bits_of(param)
+                if bit is None:
+                    unknown.append(param)
+                else:
+                    mask |= bit
+            unknown.extend(self._decode(mask & ~allowed))
+            if unknown:
+                unknown_parameters[section] = sorted(unknown)
+            missing = self.required.get(section, 0) & ~mask
+            if missing:
+                missing_parameters[section] = self._decode(missing)
+
+        violations = {}
+        if unknown_sections:
+            violations["unknown_sections"] = unknown_sections
+        if unknown_parameters:
+            violations["unknown_parameters"] = unknown_parameters
+        if missing_parameters:
+            violations["missing_parameters"] = missing_parameters
+        return violations
+
+_worker = {}
+
+def _init_worker(validator, load):
+    _worker["validator"] = validator
+    _worker["load"] = load
+
+def _validate_file(file_path, validator=None, load=None):
+    """Parse one candidate file with load and return a report line per CSV it contains."""
+    validator = validator or _worker["validator"]
+    load = load or _worker["load"]
+    try:
+        entries = load(file_path)
+    except Exception as e:  # Any file that fails to parse is reported, never fatal to the run
+        return [{"file": file_path, "error": f"{type(e).__name__}: {e}"}]
+
+    return [dict({"file": f"{file_path}/{member_path}" if member_path else file_path},
+                 **validator.check(section_params))
+            for member_path, section_params in entries]
+
+def validate_files(file_paths, validator, load, report_path, workers=1, chunksize=64, root=None):
+    """Validate candidate files and write one JSON line per CSV to report_path.
+
+    load is the pipeline's _load_csvs, so candidates are parsed exactly as template
+    inputs are. With workers > 1, files are parsed and checked in a process pool that
+    receives the validator once, in batches of chunksize; lines are written in input
+    order as results arrive. File names are reported relative to root if given.
+    Returns (CSVs checked, CSVs with violations or errors).
+    """
+    checked = failed = 0
+    start = time.perf_counter()
+    os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+
+    with open(report_path, "w", encoding="utf-8") as report:
+        if workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(validator, load))
+            results = executor.map(_validate_file, file_paths, chunksize=chunksize)
+        else:
+            executor = None
+            results = (_validate_file(file_path, validator, load) for file_path in file_paths)
+
+        try:
+            for lines in results:
+                for line in lines:
+                    if root:
+                        line["file"] = os.path.relpath(line["file"], root).replace(os.sep, "/")
+                    checked += 1
+                    failed += len(line) > 1
+                    report.write(json.dumps(line) + "\n")
+        finally:
+            if executor:
+                executor.shutdown()
+
+    seconds = time.perf_counter() - start
+    rate = checked / seconds if seconds else 0.0
+    print(f"Validated {checked} CSVs in {seconds:.2f}s ({rate:.0f}/s), {failed} with violations: {report_path}")
+    return checked, failed
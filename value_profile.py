@@ -0,0 +1,120 @@
+import json
+import collections
+from array import array
+
+class DictionaryColumn:
+    """A string column stored as integer codes into a per-column dictionary of distinct values."""
+
+    __slots__ = ("codes", "dictionary", "values")
+
+    def __init__(self):
+        self.codes = array("I")
+        self.dictionary = {}
+        self.values = []
+
+    def append(self, value):
+        code = self.dictionary.get(value)
+        if code is None:
+            code = self.dictionary[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def value_counts(self):
+        """Return {value: occurrences} for this column."""
+        counts = [0] * len(self.values)
+        for code in self.codes:
+            counts[code] += 1
+        return dict(zip(self.values, counts))
+
+    def __len__(self):
+        return len(self.codes)
+
+class ColumnarValues:
+    """Value rows of one section, stored column by column in the section's parameter order.
+
+    Each parameter line starts a new block whose columns follow that line's parameter
+    order; value rows, blank cells included, are split positionally across the current
+    block's columns. Non-blank cells past the last parameter are counted as extra, short
+    rows leave trailing columns missing.
+    """
+
+    def __init__(self):
+        self.blocks = []
+
+    def set_header(self, parameters):
+        """Start a new block of columns for a parameter line."""
+        self.blocks.append({"parameters": list(parameters), "columns": [DictionaryColumn() for _ in parameters],
+                            "rows": 0, "missing": [0] * len(parameters), "extra": 0})
+
+    def append(self, row):
+        if not self.blocks:
+            self.set_header([])
+        block = self.blocks[-1]
+        columns = block["columns"]
+
+        for column, value in zip(columns, row):
+            column.append(value)
+        for index in range(len(row), len(columns)):
+            block["missing"][index] += 1
+        if len(row) > len(columns):
+            block["extra"] += sum(1 for value in row[len(columns):] if value)
+        block["rows"] += 1
+
+    def extend(self, other):
+        """Append another ColumnarValues' blocks, e.g. from a later chunk of the same file."""
+        self.blocks.extend(other.blocks)
+
+    def __len__(self):
+        return sum(block["rows"] for block in self.blocks)
+
+    def __bool__(self):
+        return any(block["rows"] for block in self.blocks)
+
+class ValueProfile:
+    """Per-section, per-parameter value statistics accumulated one parsed CSV at a time.
+
+    Only distinct values and their counts are kept, never the rows themselves, so parsed
+    files can be dropped as soon as they are added.
+    """
+
+    def __init__(self, top_k=10):
+        self.top_k = top_k
+        self.files = 0
+        self.stats = collections.defaultdict(lambda: collections.defaultdict(
+            lambda: {"rows": 0, "empty": 0, "missing": 0, "values": collections.Counter()}))
+        self.extra_cells = collections.Counter()
+
+    def add_sections(self, sections):
+        """Fold one parse_csv result (with ColumnarValues values) into the profile."""
+        self.files += 1
+        for section, data in sections.items():
+            for block in data["values"].blocks:
+                self.extra_cells[section] += block["extra"]
+                for param, column, missing in zip(block["parameters"], block["columns"], block["missing"]):
+                    stats = self.stats[section][param]
+                    stats["rows"] += block["rows"]
+                    stats["missing"] += missing
+                    for value, count in column.value_counts().items():
+                        stats["values"][value] += count
+                        if value == "":
+                            stats["empty"] += count
+
+    def report(self):
+        """Return {section: {parameter: summary}} with distinct counts and the top-k values."""
+        report = {}
+        for section, params in self.stats.items():
+            report[section] = {}
+            for param, stats in params.items():
+                report[section][param] = {
+                    "rows": stats["rows"],
+                    "distinct": len(stats["values"]),
+                    "empty": stats["empty"],
+                    "missing": stats["missing"],
+                    "top_values": stats["values"].most_common(self.top_k),
+                }
+        return report
+
+    def save(self, file_path):
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump({"files": self.files, "extra_cells": dict(self.extra_cells), "sections": self.report()},
+                      f, indent=2)
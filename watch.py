@@ -0,0 +1,186 @@
+import os
+import csv
+import time
+import zipfile
+from parse_cache import ParseCache
+from param_index import ParameterIndex
+from template_artifacts import GLOBAL_INDEX_FILE, artifact_path, save_operator_artifact
+
+class TemplateWatcher:
+    """Keep operator and global master templates up to date by polling the operator directories.
+
+    Each poll walks the operator directories and compares file sizes and mtimes with the
+    last poll. Only new or changed files are parsed; an operator with any added, changed
+    or deleted file has its template rebuilt from the parsed files kept in memory, in walk
+    order, so the result matches a full run. Only affected operators' outputs and the
+    global master are rewritten, and only the affected files' parameter index entries.
+
+    The first poll also removes the outputs and index entries of operators that earlier
+    runs wrote but that are no longer on disk, and evicts --cache entries of files that
+    are gone.
+
+    pipeline is the TemplatePipeline of Mastertemplate or Updatedmaster, which supplies the
+    parser and template functions; global_master is a GlobalMaster configured for that pipeline.
+    """
+
+    def __init__(self, pipeline, base_directory, output_dir, global_master, cache_path=None, index_path=None):
+        self.pipeline = pipeline
+        self.base_directory = base_directory
+        self.output_dir = output_dir
+        self.global_master = global_master
+        self.cache_path = cache_path
+        self.index_path = index_path
+        # operator -> {file path: (size, mtime_ns, parsed entries or None if unreadable)}
+        self.files = {}
+        self.templates = {}
+        self.csv_param_sets = {}
+        self.polled = False
+
+    def _scan(self, operator):
+        """Return {file path: (size, mtime_ns)} for an operator in walk order."""
+        snapshot = {}
+        for file_path in self.pipeline.iter_operator_files(os.path.join(self.base_directory, operator)):
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                continue
+            snapshot[file_path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def _load(self, file_path, cache):
+        """Parse a file, or return None if it cannot be read yet, e.g. while it is still being copied."""
+        try:
+            if cache:
+                return cache.fetch(file_path, self.pipeline.load_csvs)
+            return self.pipeline.load_csvs(file_path)
+        except (OSError, UnicodeDecodeError, zipfile.BadZipFile, csv.Error) as e:
+            print(f"Skipping unreadable file for now: {file_path} ({e})")
+            return None
+
+    @staticmethod
+    def _rel_path(operator_dir, file_path):
+        return os.path.relpath(file_path, operator_dir).replace(os.sep, "/")
+
+    def _csv_entries(self, operator_dir, file_path, entries):
+        """Return (index path, section parameters) for each CSV of a parsed file, named as fold_operator_files does."""
+        rel_path = self._rel_path(operator_dir, file_path)
+        return [(f"{rel_path}/{member_path}" if member_path else rel_path, section_params)
+                for member_path, section_params in entries or []]
+
+    def _update_operator(self, operator, snapshot, cache):
+        """Re-parse changed files, replace their index entries and rebuild an operator's template.
+
+        Returns True if anything changed.
+        """
+        first_poll = operator not in self.files
+        old_files = self.files.get(operator, {})
+        if not first_poll and list(old_files) == list(snapshot) and all(
+                old_files[file_path][:2] == stat for file_path, stat in snapshot.items()):
+            return False
+
+        files = {}
+        changed = []
+        for file_path, stat in snapshot.items():
+            if file_path in old_files and old_files[file_path][:2] == stat:
+                files[file_path] = old_files[file_path]
+            else:
+                files[file_path] = stat + (self._load(file_path, cache),)
+                changed.append(file_path)
+        removed = [file_path for file_path in old_files if file_path not in files]
+        self.files[operator] = files
+
+        operator_dir = os.path.join(self.base_directory, operator)
+        if self.index_path:
+            with ParameterIndex(self.index_path) as index:
+                if first_poll:
+                    index.remove_operator(operator)
+                else:
+                    index.remove_files(operator, [self._rel_path(operator_dir, file_path)
+                                                  for file_path in changed + removed])
+                added = {file_path: self._csv_entries(operator_dir, file_path, files[file_path][2])
+                         for file_path in changed}
+                index.add_files(operator, [csv_entry for csv_entries in added.values() for csv_entry in csv_entries],
+                                {name: files[file_path][:2] for file_path, csv_entries in added.items()
+                                 for name, _ in csv_entries})
+
+        loaded = ((file_path, entries or []) for file_path, (_, _, entries) in files.items())
+        operator_template = self.pipeline.fold_operator_files(operator_dir, loaded)
+
+        template = self.pipeline.merge_templates(operator_template)
+        self.templates[operator] = template
+        self.csv_param_sets[operator] = operator_template.param_sets()
+        self.pipeline.save_master_template(operator, template, self.output_dir)
+        save_operator_artifact(operator, template, self.output_dir)
+        self.global_master.update_operator(operator, template)
+        return True
+
+    def _remove_operator(self, operator):
+        print(f"Removing Operator: {operator}")
+        for state in (self.files, self.templates, self.csv_param_sets):
+            state.pop(operator, None)
+        self.global_master.remove_operator(operator)
+        if self.index_path:
+            with ParameterIndex(self.index_path) as index:
+                index.remove_operator(operator)
+        for file_path in (artifact_path(operator, self.output_dir),
+                          os.path.join(self.output_dir, f"master_template_{operator}.txt")):
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    def _saved_operators(self):
+        """Return the operators with templates in output_dir or postings in the index, e.g. from earlier runs."""
+        operators = set()
+        if os.path.isdir(self.output_dir):
+            # Each operator's template_<operator>.json artifact is saved next to its TXT
+            operators.update(file_name[len("master_template_"):-len(".txt")] for file_name in os.listdir(self.output_dir)
+                             if file_name.startswith("master_template_") and file_name.endswith(".txt"))
+        if self.index_path:
+            with ParameterIndex(self.index_path) as index:
+                operators.update(index.operators())
+        return operators
+
+    def poll(self):
+        """Apply all changes since the last poll and return the sorted list of affected operators."""
+        operators = [operator for operator in sorted(os.listdir(self.base_directory))
+                     if os.path.isdir(os.path.join(self.base_directory, operator))]
+        known = set(self.files) if self.polled else self._saved_operators()
+        changed = sorted(operator for operator in known if operator not in operators)
+        for operator in changed:
+            self._remove_operator(operator)
+        removed_files = bool(changed)
+
+        cache = ParseCache(self.cache_path, self.pipeline.parse_cache_key) if self.cache_path else None
+        try:
+            for operator in operators:
+                old_files = self.files.get(operator, {})
+                if self._update_operator(operator, self._scan(operator), cache):
+                    changed.append(operator)
+                    removed_files = removed_files or any(file_path not in self.files[operator]
+                                                         for file_path in old_files)
+            if cache and not self.polled:
+                cache.evict_unseen(self.base_directory)  # Every file was fetched on the first poll
+            elif cache and removed_files:
+                cache.evict_missing()
+        finally:
+            if cache:
+                cache.close()
+        self.polled = True
+
+        if changed:
+            os.makedirs(self.output_dir, exist_ok=True)
+            self.global_master.save(os.path.join(self.output_dir, GLOBAL_INDEX_FILE))
+            self.pipeline.save_global_master_template(self.global_master.template(), self.output_dir)
+        return sorted(changed)
+
+    def run(self, interval=0.5):
+        """Poll every interval seconds until interrupted."""
+        print(f"Watching {self.base_directory} every {interval}s (Ctrl+C to stop)")
+        try:
+            while True:
+                start = time.perf_counter()
+                changed = self.poll()
+                if changed:
+                    print(f"Updated {', '.join(changed)} in {time.perf_counter() - start:.3f}s")
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print("Watch stopped")